@@ -1,23 +1,84 @@
 # smart_planner/agents/calendar_agent.py
 """Calendar Agent: Fetches and summarizes daily calendar events."""
 
+import functools
 import logging
-from datetime import date, datetime, time, timedelta
-from typing import List, Optional
-import json # Import json
+import threading
+from datetime import date, datetime, time, tzinfo
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple, Union
+import orjson
 
+from cachetools import LRUCache, TTLCache
 from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool # Corrected case
 from google.adk.models.base_llm import BaseLlm
 from google.adk.sessions.state import State as SessionState # Use alias
-from pydantic import ValidationError
 
+from ..config import settings
 from ..models.schemas import (CalendarEvent, CalendarSummaryOutput,
-                              FreeTimeSlot, CalendarConflict)
+                              FreeTimeSlot, CalendarConflict,
+                              CALENDAR_EVENTS_ADAPTER, validate_list_dropping_invalid)
 from ..tools import calendar_tools
+from ..tools.interval_tree import IntervalTree
+from ..tools.tool_cache import cached_tool
 
 logger = logging.getLogger(__name__)
 
+# Cache fetched events per (date, mock flag) for 5 minutes
+calendar_tool_cache = TTLCache(maxsize=32, ttl=5 * 60)
+
+# Dicts missing any of these can never validate, so they skip pydantic entirely
+_EVENT_REQUIRED_KEYS = frozenset(name for name, field in CalendarEvent.model_fields.items() if field.is_required())
+
+MIN_FREE_SLOT_MINUTES = 15 # Minimum free slot duration
+EVENT_TREE_CACHE_SIZE = 8 # Dates whose interval trees an agent keeps for re-analysis
+
+@functools.lru_cache(maxsize=128)
+def _working_hours(target_date: date, tz_info: Optional[tzinfo], start_hour: int, end_hour: int) -> Tuple[datetime, datetime]:
+    """Returns the (start, end) datetimes of working hours on a date, cached across calls."""
+    return (datetime.combine(target_date, time(start_hour, 0), tzinfo=tz_info),
+            datetime.combine(target_date, time(end_hour, 0), tzinfo=tz_info))
+
+def _find_free_gaps(starts: Sequence[float], ends: Sequence[float], day_start: float,
+                    day_end: float, min_gap: float) -> List[Tuple[int, int, float]]:
+    """
+    Finds free gaps of at least `min_gap` seconds within [day_start, day_end].
+
+    Works purely on epoch seconds of events sorted by start time, so the loop is
+    plain number arithmetic with no datetime objects involved.
+
+    Args:
+        starts: Event start timestamps, sorted ascending.
+        ends: Event end timestamps, aligned with `starts`.
+        day_start: Start of working hours.
+        day_end: End of working hours.
+        min_gap: Minimum gap length in seconds.
+
+    Returns:
+        A list of (after_idx, before_idx, seconds) tuples: the gap runs from the end
+        of event `after_idx` to the start of event `before_idx`, where -1 stands for
+        day_start and day_end respectively.
+    """
+    gaps: List[Tuple[int, int, float]] = []
+    current = day_start
+    current_idx = -1
+    for i in range(len(starts)):
+        # Clamp event times to working hours for calculation
+        start = starts[i] if starts[i] > day_start else day_start
+        end = ends[i] if ends[i] < day_end else day_end
+        # Only consider events that actually fall within working hours after clamping
+        if start < end:
+            if start - current >= min_gap:
+                gaps.append((current_idx, i, start - current))
+            if end > current: # Move pointer to the end of the clamped event
+                current = end
+                current_idx = i if ends[i] < day_end else -1
+    # Check for free slot after the last event until end of working day
+    if day_end - current >= min_gap:
+        gaps.append((current_idx, -1, day_end - current))
+    return gaps
+
 class CalendarAgent(LlmAgent):
     """
     An agent responsible for fetching, summarizing, and analyzing calendar events for a given day.
@@ -29,41 +90,102 @@ class CalendarAgent(LlmAgent):
             llm_provider=llm_provider,
             session_state=session_state
         )
+        # Live interval trees for the most recently analyzed dates; kept on the agent,
+        # not in session state. The lock covers the cache and every use of its trees.
+        self._event_trees: LRUCache = LRUCache(maxsize=EVENT_TREE_CACHE_SIZE)
+        self._event_trees_lock = threading.Lock()
 
-    @AgentTool # Corrected case
-    def get_calendar_events_tool(self, date_str: str, use_mock_data: bool = False) -> str:
+    @cached_tool(calendar_tool_cache)
+    def _get_calendar_events_raw(self, date_str: str, use_mock_data: bool = False) -> Union[List[dict], dict]:
         """
-        Tool to fetch calendar events for a specific date (YYYY-MM-DD).
+        Fetches calendar events for a specific date (YYYY-MM-DD) as plain dicts.
+
+        Used directly by `invoke` so events are not serialized and parsed back.
 
         Args:
             date_str: The target date in YYYY-MM-DD format.
             use_mock_data: Set to True to use mock data instead of Google Calendar API.
 
         Returns:
-            A JSON string representing the list of CalendarEvent dictionaries, or an error message.
+            A list of CalendarEvent dictionaries, or {"error": message} on failure.
         """
         logger.info(f"CalendarAgent tool called for date: {date_str}, mock: {use_mock_data}")
         events_dict, status_message = calendar_tools.get_daily_calendar_events(date_str, use_mock_data)
 
         if events_dict is not None:
-            # Successfully fetched events, return as JSON string for LLM or further processing
+            # Successfully fetched events
             # We might return the status message as well if needed by the LLM part
             logger.info(f"Tool status: {status_message}")
             # Combine results and status for clarity if needed, or just return events
-            # return json.dumps({"events": events_dict, "status": status_message})
-            return json.dumps(events_dict)
+            # return {"events": events_dict, "status": status_message}
+            return events_dict
         else:
             # Failed to fetch events, return the error status message
             logger.error(f"Tool failed: {status_message}")
-            return json.dumps({"error": status_message}) # Return error clearly
+            return {"error": status_message} # Return error clearly
+
+    @AgentTool # Corrected case
+    def get_calendar_events_tool(self, date_str: str, use_mock_data: bool = False) -> str:
+        """
+        Tool to fetch calendar events for a specific date (YYYY-MM-DD).
+
+        Args:
+            date_str: The target date in YYYY-MM-DD format.
+            use_mock_data: Set to True to use mock data instead of Google Calendar API.
+
+        Returns:
+            A JSON string representing the list of CalendarEvent dictionaries, or an error message.
+        """
+        return orjson.dumps(self._get_calendar_events_raw(date_str, use_mock_data)).decode()
+
+    def _get_event_tree(self, target_date: date, events: List[CalendarEvent]) -> IntervalTree:
+        """
+        Returns the interval tree of events for a date, updating it incrementally.
+
+        The tree is kept on the agent instance per date (for the last few dates),
+        so re-analyzing the same day only inserts events that were not seen before;
+        events seen before have their payload replaced with the fresh object. If an
+        event disappeared since the last analysis, the tree is rebuilt from scratch.
+        Callers must hold `_event_trees_lock` while using the tree.
+
+        Args:
+            target_date: The date being analyzed.
+            events: List of CalendarEvent objects for the day.
 
-    def analyze_schedule(self, target_date: date, events: List[CalendarEvent]) -> CalendarSummaryOutput:
+        Returns:
+            An IntervalTree containing exactly the given events.
+        """
+        tree = self._event_trees.get(target_date)
+
+        # Identify events by content plus occurrence count so identical duplicates are kept
+        occurrences: Counter = Counter()
+        keyed_events = []
+        for event in events:
+            content_key = (event.start_time, event.end_time, event.summary, event.location)
+            keyed_events.append(((content_key, occurrences[content_key]), event))
+            occurrences[content_key] += 1
+
+        if tree is None or tree.keys() - {key for key, _ in keyed_events}:
+            tree = IntervalTree()
+            self._event_trees[target_date] = tree
+        else:
+            logger.debug(f"Reusing interval tree for {target_date} with {len(tree)} events.")
+
+        for key, event in keyed_events:
+            # Keyed on timestamps so tree ordering and queries compare floats, not datetimes
+            tree.insert(event.start_time.timestamp(), event.end_time.timestamp(), key, event)
+        return tree
+
+    def analyze_schedule(self, target_date: date, events: List[CalendarEvent],
+                         working_hours: Optional[Tuple[int, int]] = None) -> CalendarSummaryOutput:
         """
         Analyzes the fetched events to find free slots and conflicts.
 
         Args:
             target_date: The date being analyzed.
             events: List of CalendarEvent objects for the day.
+            working_hours: Optional (start_hour, end_hour) for free slot calculation.
+                           Defaults to the configured working hours.
 
         Returns:
             A CalendarSummaryOutput object containing events, free slots, and conflicts.
@@ -72,77 +194,57 @@ class CalendarAgent(LlmAgent):
         free_slots: List[FreeTimeSlot] = []
         conflicts: List[CalendarConflict] = []
 
-        # Sort events by start time
-        events.sort(key=lambda x: x.start_time)
+        # Index events in the per-date interval tree (reused across invocations)
+        with self._event_trees_lock:
+            tree = self._get_event_tree(target_date, events)
+            events = list(tree) # In-order traversal yields events sorted by start time
+            overlapping = [tree.overlapping(event.start_time.timestamp(), event.end_time.timestamp())
+                           for event in events]
 
         # Define working hours for free slot calculation (e.g., 9 AM to 5 PM)
-        # This could be made configurable
+        config = settings.get_settings()
+        start_hour, end_hour = working_hours or (config.WORKING_HOURS_START, config.WORKING_HOURS_END)
         # Ensure timezone consistency - use timezone from first event if available, else assume naive/local
         tz_info = events[0].start_time.tzinfo if events and events[0].start_time.tzinfo else None
-        day_start_time = datetime.combine(target_date, time(9, 0), tzinfo=tz_info)
-        day_end_time = datetime.combine(target_date, time(17, 0), tzinfo=tz_info)
+        day_start_time, day_end_time = _working_hours(target_date, tz_info, start_hour, end_hour)
 
 
-        current_time = day_start_time
+        # Find the gaps on epoch seconds; datetimes are only localized for emitted slots
+        def to_local(value: datetime) -> datetime:
+            """Ensure event times are timezone-aware if day_start/end are."""
+            if not tz_info:
+                return value # Handle naive comparison
+            return value.astimezone(tz_info) if value.tzinfo else value.replace(tzinfo=tz_info)
 
-        # Calculate free slots
-        for event in events:
-             # Ensure event times are timezone-aware if day_start/end are
-            if tz_info:
-                event_start_aware = event.start_time.astimezone(tz_info) if event.start_time.tzinfo else event.start_time.replace(tzinfo=tz_info)
-                event_end_aware = event.end_time.astimezone(tz_info) if event.end_time.tzinfo else event.end_time.replace(tzinfo=tz_info)
-            else: # Handle naive comparison
-                event_start_aware = event.start_time
-                event_end_aware = event.end_time
-
-
-            # Clamp event times to working hours for calculation
-            event_start_clamped = max(event_start_aware, day_start_time)
-            event_end_clamped = min(event_end_aware, day_end_time)
-
-            # Only consider events that actually fall within working hours after clamping
-            if event_start_clamped < event_end_clamped:
-                if event_start_clamped > current_time:
-                    free_duration = event_start_clamped - current_time
-                    if free_duration >= timedelta(minutes=15): # Minimum free slot duration
-                        free_slots.append(FreeTimeSlot(
-                            start_time=current_time,
-                            end_time=event_start_clamped,
-                            duration_minutes=int(free_duration.total_seconds() / 60)
-                        ))
-                current_time = max(current_time, event_end_clamped) # Move pointer to the end of the clamped event
-
-        # Check for free slot after the last event until end of working day
-        if day_end_time > current_time:
-            free_duration = day_end_time - current_time
-            if free_duration >= timedelta(minutes=15):
-                free_slots.append(FreeTimeSlot(
-                    start_time=current_time,
-                    end_time=day_end_time,
-                    duration_minutes=int(free_duration.total_seconds() / 60)
-                ))
+        def to_seconds(value: datetime) -> float:
+            return (value.replace(tzinfo=tz_info) if tz_info and not value.tzinfo else value).timestamp()
 
-        # Detect conflicts (simple overlap check)
-        for i in range(len(events)):
-            for j in range(i + 1, len(events)):
-                event1 = events[i]
-                event2 = events[j]
-                # Check for overlap: max(start1, start2) < min(end1, end2)
-                if max(event1.start_time, event2.start_time) < min(event1.end_time, event2.end_time):
-                    conflict_exists = False
-                    # Avoid adding duplicate conflicts involving the same events
-                    for existing_conflict in conflicts:
-                        if event1 in existing_conflict.conflicting_events and \
-                           event2 in existing_conflict.conflicting_events:
-                            conflict_exists = True
-                            break
-                    if not conflict_exists:
-                        conflicts.append(CalendarConflict(
-                            conflicting_events=[event1, event2],
-                            details=f"Overlap between '{event1.summary}' ({event1.start_time.strftime('%H:%M')}-{event1.end_time.strftime('%H:%M')}) "
-                                    f"and '{event2.summary}' ({event2.start_time.strftime('%H:%M')}-{event2.end_time.strftime('%H:%M')})"
-                        ))
-                        logger.warning(f"Conflict detected: {conflicts[-1].details}")
+        gaps = _find_free_gaps(
+            [to_seconds(event.start_time) for event in events],
+            [to_seconds(event.end_time) for event in events],
+            day_start_time.timestamp(),
+            day_end_time.timestamp(),
+            MIN_FREE_SLOT_MINUTES * 60
+        )
+        for after_idx, before_idx, free_seconds in gaps:
+            free_slots.append(FreeTimeSlot(
+                start_time=to_local(events[after_idx].end_time) if after_idx >= 0 else day_start_time,
+                end_time=to_local(events[before_idx].start_time) if before_idx >= 0 else day_end_time,
+                duration_minutes=int(free_seconds / 60)
+            ))
+
+        # Report conflicts from the overlap queries made against the tree above
+        index_by_id = {id(event): idx for idx, event in enumerate(events)}
+        for i, event2 in enumerate(events):
+            for event1 in overlapping[i]:
+                if index_by_id[id(event1)] >= i:
+                    continue # Report each pair once, from the later event
+                conflicts.append(CalendarConflict(
+                    conflicting_events=[event1, event2],
+                    details=f"Overlap between '{event1.summary}' ({event1.start_time.strftime('%H:%M')}-{event1.end_time.strftime('%H:%M')}) "
+                            f"and '{event2.summary}' ({event2.start_time.strftime('%H:%M')}-{event2.end_time.strftime('%H:%M')})"
+                ))
+                logger.warning(f"Conflict detected: {conflicts[-1].details}")
 
 
         return CalendarSummaryOutput(
@@ -157,18 +259,25 @@ class CalendarAgent(LlmAgent):
         Main execution logic for the Calendar Agent.
 
         Args:
-            input_data (dict): Dictionary containing 'date_str' (YYYY-MM-DD)
-                               and optionally 'use_mock_data' (bool).
+            input_data (dict): Dictionary containing 'date_str' (YYYY-MM-DD) or an
+                               already-parsed 'target_date' (date), and optionally
+                               'use_mock_data' (bool) and 'working_hours'
+                               ((start_hour, end_hour)).
 
         Returns:
             CalendarSummaryOutput: The structured summary of the calendar for the given date.
                                    Returns an empty summary on failure.
         """
         target_date_str = input_data.get("date_str")
+        parsed_date = input_data.get("target_date")
         use_mock = input_data.get("use_mock_data", False) # Default to API
+        working_hours = input_data.get("working_hours") # Defaults to configured hours
 
         # Determine a default date if none provided (e.g., today)
-        if not target_date_str:
+        if isinstance(parsed_date, date):
+            target_date = parsed_date # Already parsed by the caller
+            target_date_str = target_date.isoformat()
+        elif not target_date_str:
             target_date = date.today()
             target_date_str = target_date.isoformat()
             logger.warning(f"No date_str provided, defaulting to today: {target_date_str}")
@@ -183,11 +292,9 @@ class CalendarAgent(LlmAgent):
 
         logger.info(f"CalendarAgent invoking for date: {target_date_str}, mock: {use_mock}")
 
-        # Call the tool to get raw event data
-        events_json_str = self.get_calendar_events_tool(date_str=target_date_str, use_mock_data=use_mock)
-
         try:
-            events_data = json.loads(events_json_str)
+            # Fetch the event dicts directly, skipping the tool's JSON encoding
+            events_data = self._get_calendar_events_raw(date_str=target_date_str, use_mock_data=use_mock)
 
             if isinstance(events_data, dict) and "error" in events_data:
                 logger.error(f"Tool returned an error: {events_data['error']}")
@@ -197,33 +304,31 @@ class CalendarAgent(LlmAgent):
             # Validate and parse events using Pydantic
             parsed_events: List[CalendarEvent] = []
             if isinstance(events_data, list):
-                 for event_dict in events_data:
-                     try:
-                         # Ensure datetime objects are created correctly if tool returns strings
-                         # The CalendarEvent validator should handle ISO strings
-                         parsed_events.append(CalendarEvent(**event_dict))
-                     except ValidationError as e:
-                         logger.warning(f"Skipping event due to validation error: {event_dict.get('summary', 'N/A')}. Error: {e}")
-                     except Exception as e:
-                         logger.error(f"Unexpected error parsing event dict: {event_dict}. Error: {e}")
+                candidates = [event_dict for event_dict in events_data
+                              if isinstance(event_dict, dict) and _EVENT_REQUIRED_KEYS <= event_dict.keys()]
+                if len(candidates) < len(events_data):
+                    logger.warning(f"Skipping {len(events_data) - len(candidates)} events missing required fields.")
+                events_data = candidates
+                # The CalendarEvent validator handles ISO strings returned by the tool
+                parsed_events = validate_list_dropping_invalid(
+                    CALENDAR_EVENTS_ADAPTER, events_data, logger,
+                    describe=lambda event_dict: f"event '{event_dict.get('summary', 'N/A')}'"
+                )
 
             logger.info(f"Successfully parsed {len(parsed_events)} events from tool output.")
 
             # Analyze the schedule
-            summary = self.analyze_schedule(target_date, parsed_events)
+            summary = self.analyze_schedule(target_date, parsed_events, working_hours=tuple(working_hours) if working_hours else None)
             logger.info(f"Schedule analysis complete for {target_date}. Found {len(summary.free_slots)} free slots and {len(summary.conflicts)} conflicts.")
 
             # Store result in session state if needed for other agents
             if self.session_state:
-                # Use model_dump for Pydantic V2
-                self.session_state.set("calendar_summary", summary.model_dump(mode='json'))
+                # Store as a JSON string so readers can re-parse it in pydantic-core directly
+                self.session_state.set("calendar_summary", summary.model_dump_json())
                 logger.debug("Stored calendar summary in session state.")
 
             return summary
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON response from tool: {e}. Response: {events_json_str}")
-            return CalendarSummaryOutput(summary_date=target_date, events=[], free_slots=[], conflicts=[]) # Renamed from 'date'
         except Exception as e:
             logger.exception(f"An unexpected error occurred during CalendarAgent invocation for {target_date_str}: {e}")
             return CalendarSummaryOutput(summary_date=target_date, events=[], free_slots=[], conflicts=[]) # Renamed from 'date'
\ No newline at end of file
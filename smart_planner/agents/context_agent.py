@@ -1,23 +1,37 @@
 # smart_planner/agents/context_agent.py
 """Context Agent: Fetches weather/traffic data and provides recommendations."""
 
+import asyncio
+import hashlib
 import logging
-import json
+import orjson
 from datetime import datetime, time, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Tuple
 
+from cachetools import TTLCache
 from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool # Corrected case
 from google.adk.models.base_llm import BaseLlm
 from google.adk.sessions.state import State as SessionState # Use alias
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from ..models.schemas import (ContextOutput, ContextRecommendation, WeatherInfo,
                               TrafficInfo, CalendarSummaryOutput, CalendarEvent)
 from ..tools import external_tools
+from ..tools.tool_cache import cached_tool
 
 logger = logging.getLogger(__name__)
 
+# Cache tool results (e.g., weather for 10 minutes, traffic for 2 minutes)
+weather_tool_cache = TTLCache(maxsize=100, ttl=10 * 60)
+traffic_tool_cache = TTLCache(maxsize=100, ttl=2 * 60)
+
+# Cache generated recommendations per (date, events fingerprint) for 10 minutes
+recommendations_cache = TTLCache(maxsize=32, ttl=10 * 60)
+
+# Compiled once and reused for every session-state re-parse
+_CALENDAR_SUMMARY_ADAPTER = TypeAdapter(CalendarSummaryOutput)
+
 # Default locations (Consider making these configurable or user-provided via .env or input)
 DEFAULT_HOME_LOCATION = "40.7128,-74.0060" # Example: NYC lat/lon
 DEFAULT_WORK_LOCATION = "40.7580,-73.9855" # Example: Times Square lat/lon
@@ -35,68 +49,183 @@ class ContextAgent(LlmAgent):
             session_state=session_state
         )
 
-    @AgentTool # Corrected case
-    def get_weather_tool(self, location_query: str) -> str:
+    @cached_tool(weather_tool_cache)
+    async def _get_weather_raw(self, location_query: str) -> dict:
         """
-        Tool to get current weather for a location.
+        Gets current weather for a location as a plain dict.
 
         Args:
             location_query: Location query, ideally "latitude,longitude".
 
         Returns:
-            JSON string of WeatherInfo or error message.
+            WeatherInfo dictionary, or {"error": message} on failure.
         """
         logger.info(f"ContextAgent weather tool called for location: {location_query}")
-        weather_dict, status_message = external_tools.get_current_weather(location_query)
+        # Run the blocking HTTP call in a worker thread so other lookups can proceed
+        weather_dict, status_message = await asyncio.to_thread(external_tools.get_current_weather, location_query)
         if weather_dict:
             logger.info(f"Weather tool status: {status_message}")
-            return json.dumps(weather_dict)
+            return weather_dict
         else:
             logger.error(f"Weather tool failed: {status_message}")
-            return json.dumps({"error": status_message})
+            return {"error": status_message}
 
     @AgentTool # Corrected case
-    def get_traffic_tool(self, origin: str, destination: str) -> str:
+    async def get_weather_tool(self, location_query: str) -> str:
         """
-        Tool to get traffic information between two locations.
+        Tool to get current weather for a location.
+
+        Args:
+            location_query: Location query, ideally "latitude,longitude".
+
+        Returns:
+            JSON string of WeatherInfo or error message.
+        """
+        return orjson.dumps(await self._get_weather_raw(location_query)).decode()
+
+    @cached_tool(traffic_tool_cache)
+    async def _get_traffic_raw(self, origin: str, destination: str) -> dict:
+        """
+        Gets traffic information between two locations as a plain dict.
 
         Args:
             origin: Starting address or "lat,lon".
             destination: Ending address or "lat,lon".
 
         Returns:
-            JSON string of TrafficInfo or error message.
+            TrafficInfo dictionary (condition 'unreachable' if no route exists),
+            or {"error": message} on failure.
         """
         logger.info(f"ContextAgent traffic tool called for: {origin} -> {destination}")
-        traffic_dict, status_message = external_tools.get_traffic_info(origin, destination)
+        traffic_dict, status_message = await asyncio.to_thread(external_tools.get_traffic_info, origin, destination)
         if traffic_dict:
             logger.info(f"Traffic tool status: {status_message}")
-            return json.dumps(traffic_dict)
+            return traffic_dict
         else:
             logger.error(f"Traffic tool failed: {status_message}")
-            # Handle specific case of "No route found" differently if needed
-            if "No route found" in status_message:
-                 return json.dumps({"status": "ZERO_RESULTS", "message": status_message})
-            return json.dumps({"error": status_message})
+            return {"error": status_message}
 
-    def generate_recommendations(self, calendar_summary: Optional[CalendarSummaryOutput]) -> List[ContextRecommendation]:
+    @AgentTool # Corrected case
+    async def get_traffic_tool(self, origin: str, destination: str) -> str:
+        """
+        Tool to get traffic information between two locations.
+
+        Args:
+            origin: Starting address or "lat,lon".
+            destination: Ending address or "lat,lon".
+
+        Returns:
+            JSON string of TrafficInfo or error message.
+        """
+        return orjson.dumps(await self._get_traffic_raw(origin, destination)).decode()
+
+    @staticmethod
+    def _recommendations_key(calendar_summary: Optional[CalendarSummaryOutput]) -> Tuple[str, Optional[str]]:
+        """
+        Builds the recommendations cache key from the only inputs that matter:
+        the target date and the day's events.
+        """
+        if not calendar_summary:
+            return datetime.now().date().isoformat(), None
+        events_json = calendar_summary.model_dump_json(include={"events"})
+        fingerprint = hashlib.blake2b(events_json.encode(), digest_size=16).hexdigest()
+        return calendar_summary.summary_date.isoformat(), fingerprint
+
+    async def generate_recommendations(self, calendar_summary: Optional[CalendarSummaryOutput],
+                                       weather_without_events: bool = True) -> List[ContextRecommendation]:
         """
         Generates context-based recommendations using weather and traffic tools.
 
+        The weather lookup and the traffic lookups for each commute leg are
+        independent, so they are issued concurrently and awaited together;
+        legs sharing the same route are looked up once, and legs sharing an
+        origin or destination are answered together by one Distance Matrix call
+        that runs alongside the remaining per-route lookups. Results are memoized
+        per date and events fingerprint, so an identical re-invoke skips the
+        lookups; runs where a lookup failed are not cached.
+
         Args:
             calendar_summary: The calendar summary obtained from session state.
+            weather_without_events: If False, an empty day (a calendar summary with
+                                    no events) returns no recommendations without
+                                    any external calls.
 
         Returns:
             A list of ContextRecommendation objects.
         """
+        if calendar_summary and not calendar_summary.events and not weather_without_events:
+            logger.info(f"No events on {calendar_summary.summary_date}; skipping context lookups.")
+            return []
+
+        cache_key = self._recommendations_key(calendar_summary)
+        cached_recommendations = recommendations_cache.get(cache_key)
+        if cached_recommendations is not None:
+            logger.info(f"Reusing cached context recommendations for {cache_key[0]}")
+            return list(cached_recommendations)
+
         recommendations: List[ContextRecommendation] = []
+        lookups_succeeded = True
         target_date = calendar_summary.summary_date if calendar_summary else datetime.now().date() # Renamed from 'date'
         logger.info(f"Generating context recommendations for {target_date}")
 
-        # 1. Get General Weather for the Day (e.g., for home location)
+        # Build one commute leg per event with a location, each starting where the
+        # previous leg ended (home for the first one)
+        commute_jobs: List[Tuple[str, str, datetime]] = []
+        has_locations = bool(calendar_summary) and any(event.location for event in calendar_summary.events)
+        if has_locations:
+            # Events are kept sorted by CalendarSummaryOutput, so this walks the day in order
+            origin = DEFAULT_HOME_LOCATION
+            for event in calendar_summary.events:
+                 if not event.location:
+                     continue
+                 # Need to convert location name to lat/lon or use address directly
+                 # A geocoding step would be needed here for addresses
+                 if ',' in event.location: # Basic check for lat/lon format
+                     destination = event.location
+                     logger.info(f"Found event with coordinates: '{event.summary}' at {event.location}")
+                 else:
+                     # Placeholder: Use default work location if event location isn't coordinates
+                     logger.warning(f"Event location '{event.location}' for '{event.summary}' is not coordinates. Using default work location for traffic check.")
+                     destination = DEFAULT_WORK_LOCATION
+                 if destination != origin: # No travel needed when staying put
+                     commute_jobs.append((origin, destination, event.start_time))
+                 origin = destination
+
+        # Issue the weather lookup and every distinct traffic lookup concurrently
+        routes = list(dict.fromkeys((origin, destination) for origin, destination, _ in commute_jobs))
+        for origin, destination in routes:
+            logger.info(f"Checking commute traffic: {origin} -> {destination}")
+        # Routes sharing an origin or destination are answered by one Distance Matrix
+        # call in place of their Directions calls; the rest go out per route alongside it
+        batched_routes = [route for group in external_tools.group_routes_for_matrix(routes) for route in group]
+        batched_set = frozenset(batched_routes)
+        single_routes = [route for route in routes if route not in batched_set]
+
+        async def lookup_batched_routes() -> list:
+            if batched_routes:
+                try:
+                    await asyncio.to_thread(external_tools.prefetch_traffic_data, batched_routes)
+                except Exception as e:
+                    logger.warning(f"Traffic prefetch failed, falling back to per-route lookups: {e}")
+            # Prefetched routes are cache hits; anything the matrix missed is fetched here
+            return await asyncio.gather(
+                *(self._get_traffic_raw(origin=origin, destination=destination) for origin, destination in batched_routes),
+                return_exceptions=True
+            )
+
+        weather_data, batched_results, *single_results = await asyncio.gather(
+            self._get_weather_raw(location_query=DEFAULT_HOME_LOCATION),
+            lookup_batched_routes(),
+            *(self._get_traffic_raw(origin=origin, destination=destination) for origin, destination in single_routes),
+            return_exceptions=True
+        )
+        # lookup_batched_routes collects its own exceptions, so it always returns a list
+        traffic_by_route = dict(zip([*batched_routes, *single_routes], [*batched_results, *single_results]))
+
+        # 1. General Weather for the Day (e.g., for home location)
         try:
-            weather_json_str = self.get_weather_tool(location_query=DEFAULT_HOME_LOCATION)
-            weather_data = json.loads(weather_json_str)
+            if isinstance(weather_data, Exception):
+                raise weather_data
             if "error" not in weather_data:
                 weather_info = WeatherInfo(**weather_data)
                 # Simple recommendation based on weather description
@@ -114,92 +243,104 @@ class ContextAgent(LlmAgent):
                 logger.info(f"Added general weather recommendation: {rec_detail_text}") # Log the text summary
             else:
                 logger.warning(f"Could not get general weather: {weather_data.get('error')}")
+                lookups_succeeded = False
         except Exception as e:
             logger.error(f"Error processing general weather: {e}")
+            lookups_succeeded = False
 
 
-        # 2. Get Traffic for Commute (if applicable based on calendar events)
-        first_event_location = None
-        first_event_time = None
-        if calendar_summary and calendar_summary.events:
-            # Sort events to find the earliest one with a location
-            sorted_events = sorted(calendar_summary.events, key=lambda x: x.start_time)
-            for event in sorted_events:
-                 event_start_hour = event.start_time.hour
-                 # Check if event is within a reasonable morning commute window and has a location
-                 if 8 <= event_start_hour < 12 and event.location:
-                     # Need to convert location name to lat/lon or use address directly
-                     # A geocoding step would be needed here for addresses
-                     if ',' in event.location: # Basic check for lat/lon format
-                         first_event_location = event.location
-                         first_event_time = event.start_time
-                         logger.info(f"Found first event with coordinates: '{event.summary}' at {event.location}")
-                         break
-                     else:
-                         # Placeholder: Use default work location if event location isn't coordinates
-                         logger.warning(f"Event location '{event.location}' for '{event.summary}' is not coordinates. Using default work location for traffic check.")
-                         first_event_location = DEFAULT_WORK_LOCATION
-                         first_event_time = event.start_time
-                         break # Found the first relevant event
-
-        if first_event_location and first_event_time:
-            origin = DEFAULT_HOME_LOCATION
-            destination = first_event_location
+        # 2. Traffic before each event with a location
+        for origin, destination, event_time in commute_jobs:
             try:
-                logger.info(f"Checking morning commute traffic: {origin} -> {destination}")
-                traffic_json_str = self.get_traffic_tool(origin=origin, destination=destination)
-                traffic_data = json.loads(traffic_json_str)
+                traffic_data = traffic_by_route[(origin, destination)]
+                if isinstance(traffic_data, Exception):
+                    raise traffic_data
 
-                if "error" not in traffic_data and traffic_data.get("status") != "ZERO_RESULTS":
+                if "error" not in traffic_data:
                     traffic_info = TrafficInfo(**traffic_data)
+                    if traffic_info.condition == 'unreachable':
+                        logger.info(f"No route found for commute: {origin} -> {destination}")
                     # Only add recommendation if there's a notable condition/delay
-                    if traffic_info.condition in ['moderate', 'heavy', 'severe'] or traffic_info.delay_minutes > 5:
+                    elif traffic_info.condition in ['moderate', 'heavy', 'severe'] or traffic_info.delay_minutes > 5:
                         recommendations.append(ContextRecommendation(
                             type="traffic",
                             details=traffic_info, # Store the full info object
-                            impact_time=first_event_time - timedelta(minutes=traffic_info.delay_minutes + 30) if traffic_info.delay_minutes else first_event_time - timedelta(hours=1) # Impact time relative to event start and delay
+                            impact_time=event_time - timedelta(minutes=traffic_info.delay_minutes + 30) if traffic_info.delay_minutes else event_time - timedelta(hours=1) # Impact time relative to event start and delay
                         ))
                         logger.info(f"Added traffic recommendation: {traffic_info.recommendation}")
-                elif traffic_data.get("status") == "ZERO_RESULTS":
-                     logger.info(f"No route found for morning commute: {origin} -> {destination}")
                 else:
                     logger.warning(f"Could not get traffic data: {traffic_data.get('error') or 'Unknown error'}")
+                    lookups_succeeded = False
             except Exception as e:
                 logger.error(f"Error processing traffic data: {e}")
+                lookups_succeeded = False
 
         # TODO: Add more sophisticated logic:
-        # - Check traffic before each event with a location.
         # - Check weather forecast for specific event times (requires forecast API).
         # - Use event locations for weather checks if different from home.
         # - Allow user configuration for home/work/common locations.
         # - Implement geocoding for address-based locations.
 
+        if lookups_succeeded:
+            recommendations_cache[cache_key] = list(recommendations)
         return recommendations
 
 
     def invoke(self, input_data: dict) -> ContextOutput:
+        """
+        Synchronous entry point; runs `ainvoke` in a new event loop.
+
+        Only usable where no event loop is running; async callers must
+        `await agent.ainvoke(input_data)` instead.
+
+        Args:
+            input_data (dict): See `ainvoke`.
+
+        Returns:
+            ContextOutput: See `ainvoke`.
+
+        Raises:
+            RuntimeError: If called from inside a running event loop.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.ainvoke(input_data))
+        raise RuntimeError("ContextAgent.invoke() cannot run inside an event loop; await ContextAgent.ainvoke() instead.")
+
+    async def ainvoke(self, input_data: dict) -> ContextOutput:
         """
         Main execution logic for the Context Agent.
 
         Args:
             input_data (dict): Potentially contains user preferences or specific locations,
                                but primarily relies on session state for calendar data.
+                               Optionally 'weather_without_events' (bool, default True);
+                               set to False to skip all lookups for a day without events.
+                               Optionally 'calendar_summary' (CalendarSummaryOutput), an
+                               already-validated summary handed over in-process; when
+                               given, session state is not read or re-validated.
 
         Returns:
             ContextOutput: The structured list of contextual recommendations.
                            Returns an empty list on failure or if no context is available.
         """
         logger.info("ContextAgent invoking...")
-        calendar_summary_data: Optional[Dict[str, Any]] = None
+        calendar_summary_data: Optional[str] = None
         calendar_summary: Optional[CalendarSummaryOutput] = None
 
-        # Retrieve calendar summary from session state
-        if self.session_state:
+        # A model instance from the producing agent was validated when it was built
+        trusted_summary = input_data.get("calendar_summary")
+        if isinstance(trusted_summary, CalendarSummaryOutput):
+            calendar_summary = trusted_summary
+            logger.info("Using calendar summary handed over by the caller.")
+        # Otherwise retrieve calendar summary from session state
+        elif self.session_state:
             calendar_summary_data = self.session_state.get("calendar_summary")
-            if calendar_summary_data and isinstance(calendar_summary_data, dict):
+            if calendar_summary_data and isinstance(calendar_summary_data, str):
                 try:
-                    # Re-parse from dict to handle potential datetime string serialization
-                    calendar_summary = CalendarSummaryOutput.model_validate(calendar_summary_data)
+                    # Parse the stored JSON straight into the model (no intermediate dict)
+                    calendar_summary = _CALENDAR_SUMMARY_ADAPTER.validate_json(calendar_summary_data)
                     logger.info("Successfully retrieved and validated calendar summary from session state.")
                 except ValidationError as e:
                     logger.error(f"Failed to validate calendar summary from session state: {e}")
@@ -213,14 +354,17 @@ class ContextAgent(LlmAgent):
             logger.warning("No session state available for ContextAgent.")
 
         # Generate recommendations based on available context
-        recommendations = self.generate_recommendations(calendar_summary)
+        recommendations = await self.generate_recommendations(
+            calendar_summary,
+            weather_without_events=input_data.get("weather_without_events", True)
+        )
 
         output = ContextOutput(recommendations=recommendations)
         logger.info(f"ContextAgent generated {len(recommendations)} recommendations.")
 
         # Store result in session state
         if self.session_state:
-            self.session_state.set("context_recommendations", output.model_dump(mode='json'))
+            self.session_state.set("context_recommendations", output.model_dump_json())
             logger.debug("Stored context recommendations in session state.")
 
         return output
\ No newline at end of file
@@ -5,20 +5,28 @@
 """Email Agent: Analyzes emails to extract and prioritize tasks."""
 
 import logging
-import json
-from typing import List, Optional
+import orjson
+from typing import List, Optional, Union
 
+from cachetools import TTLCache
 from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool # Corrected case
 from google.adk.models.base_llm import BaseLlm
 from google.adk.sessions.state import State as SessionState # Use alias
-from pydantic import ValidationError
 
-from ..models.schemas import EmailTask, PrioritizedTaskListOutput
+from ..models.schemas import (EmailTask, PrioritizedTaskListOutput,
+                              EMAIL_TASKS_ADAPTER, validate_list_dropping_invalid)
 from ..tools import email_tools
+from ..tools.tool_cache import cached_tool
 
 logger = logging.getLogger(__name__)
 
+# Cache extracted tasks per (mock flag, max emails) for 5 minutes
+email_tool_cache = TTLCache(maxsize=8, ttl=5 * 60)
+
+# Dicts missing any of these can never validate, so they skip pydantic entirely
+_TASK_REQUIRED_KEYS = frozenset(name for name, field in EmailTask.model_fields.items() if field.is_required())
+
 class EmailAgent(LlmAgent):
     """
     An agent responsible for analyzing emails to extract tasks and assign priorities.
@@ -31,18 +39,19 @@ class EmailAgent(LlmAgent):
             session_state=session_state
         )
 
-    @AgentTool # Corrected case
-    def get_email_tasks_tool(self, use_mock_data: bool = True, max_emails_api: int = 20) -> str:
+    @cached_tool(email_tool_cache)
+    def _get_email_tasks_raw(self, use_mock_data: bool = True, max_emails_api: int = 20) -> Union[List[dict], dict]:
         """
-        Tool to fetch emails (mock or API) and extract a prioritized list of tasks.
+        Fetches emails (mock or API) and extracts a prioritized list of task dicts.
+
+        Used directly by `invoke` so tasks are not serialized and parsed back.
 
         Args:
             use_mock_data: Set to True to use mock email data. Defaults to True.
             max_emails_api: Max emails to fetch if using Gmail API. Defaults to 20.
 
         Returns:
-            A JSON string representing the PrioritizedTaskListOutput (list of tasks),
-            or an error message.
+            A list of EmailTask dictionaries, or {"error": message} on failure.
         """
         logger.info(f"EmailAgent tool called, mock: {use_mock_data}, max_api: {max_emails_api}")
         tasks_dict, status_message = email_tools.get_prioritized_tasks_from_emails(use_mock_data, max_emails_api)
@@ -50,10 +59,25 @@ class EmailAgent(LlmAgent):
         if tasks_dict is not None:
             logger.info(f"Tool status: {status_message}")
             # Return the list of task dictionaries directly
-            return json.dumps(tasks_dict)
+            return tasks_dict
         else:
             logger.error(f"Tool failed: {status_message}")
-            return json.dumps({"error": status_message})
+            return {"error": status_message}
+
+    @AgentTool # Corrected case
+    def get_email_tasks_tool(self, use_mock_data: bool = True, max_emails_api: int = 20) -> str:
+        """
+        Tool to fetch emails (mock or API) and extract a prioritized list of tasks.
+
+        Args:
+            use_mock_data: Set to True to use mock email data. Defaults to True.
+            max_emails_api: Max emails to fetch if using Gmail API. Defaults to 20.
+
+        Returns:
+            A JSON string representing the PrioritizedTaskListOutput (list of tasks),
+            or an error message.
+        """
+        return orjson.dumps(self._get_email_tasks_raw(use_mock_data, max_emails_api)).decode()
 
     def invoke(self, input_data: dict) -> PrioritizedTaskListOutput:
         """
@@ -72,11 +96,9 @@ class EmailAgent(LlmAgent):
 
         logger.info(f"EmailAgent invoking, mock: {use_mock}, max_api: {max_api}")
 
-        # Call the tool to get task data
-        tasks_json_str = self.get_email_tasks_tool(use_mock_data=use_mock, max_emails_api=max_api)
-
         try:
-            tasks_data = json.loads(tasks_json_str)
+            # Fetch the task dicts directly, skipping the tool's JSON encoding
+            tasks_data = self._get_email_tasks_raw(use_mock_data=use_mock, max_emails_api=max_api)
 
             if isinstance(tasks_data, dict) and "error" in tasks_data:
                 logger.error(f"Tool returned an error: {tasks_data['error']}")
@@ -85,13 +107,15 @@ class EmailAgent(LlmAgent):
             # Validate and parse tasks using Pydantic
             parsed_tasks: List[EmailTask] = []
             if isinstance(tasks_data, list):
-                for task_dict in tasks_data:
-                    try:
-                        parsed_tasks.append(EmailTask(**task_dict))
-                    except ValidationError as e:
-                        logger.warning(f"Skipping task due to validation error: {task_dict.get('description', 'N/A')}. Error: {e}")
-                    except Exception as e:
-                         logger.error(f"Unexpected error parsing task dict: {task_dict}. Error: {e}")
+                candidates = [task_dict for task_dict in tasks_data
+                              if isinstance(task_dict, dict) and _TASK_REQUIRED_KEYS <= task_dict.keys()]
+                if len(candidates) < len(tasks_data):
+                    logger.warning(f"Skipping {len(tasks_data) - len(candidates)} tasks missing required fields.")
+                tasks_data = candidates
+                parsed_tasks = validate_list_dropping_invalid(
+                    EMAIL_TASKS_ADAPTER, tasks_data, logger,
+                    describe=lambda task_dict: f"task '{task_dict.get('description', 'N/A')}'"
+                )
 
 
             logger.info(f"Successfully parsed {len(parsed_tasks)} tasks from tool output.")
@@ -100,15 +124,12 @@ class EmailAgent(LlmAgent):
 
             # Store result in session state
             if self.session_state:
-                # Use model_dump for Pydantic V2
-                self.session_state.set("prioritized_tasks", output.model_dump(mode='json'))
+                # Store as a JSON string so readers can re-parse it in pydantic-core directly
+                self.session_state.set("prioritized_tasks", output.model_dump_json())
                 logger.debug("Stored prioritized tasks in session state.")
 
             return output
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON response from tool: {e}. Response: {tasks_json_str}")
-            return PrioritizedTaskListOutput(tasks=[])
         except Exception as e:
             logger.exception(f"An unexpected error occurred during EmailAgent invocation: {e}")
             return PrioritizedTaskListOutput(tasks=[])
@@ -2,44 +2,17 @@
 """Loads application settings from environment variables."""
 
 import os
+import functools
 import logging
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Any, Optional
 
 # Determine the project root directory (assuming settings.py is in smart_planner/config)
 # Project root is two levels up from this file's directory
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
-# Load environment variables from .env file located in the project root
-dotenv_path = PROJECT_ROOT / '.env'
-load_dotenv(dotenv_path=dotenv_path)
-
-# --- Google API Credentials ---
-GOOGLE_CLIENT_ID: Optional[str] = os.getenv("GOOGLE_CLIENT_ID")
-GOOGLE_CLIENT_SECRET: Optional[str] = os.getenv("GOOGLE_CLIENT_SECRET")
-GOOGLE_PROJECT_ID: Optional[str] = os.getenv("GOOGLE_PROJECT_ID")
-
-# --- External API Keys ---
-GOOGLE_MAPS_API_KEY: Optional[str] = os.getenv("GOOGLE_MAPS_API_KEY")
-OPENWEATHERMAP_API_KEY: Optional[str] = os.getenv("OPENWEATHERMAP_API_KEY")
-
-# --- Mock Data Paths ---
-# Construct absolute paths from relative paths defined in .env
-MOCK_EMAIL_FILE_PATH_STR: Optional[str] = os.getenv("MOCK_EMAIL_FILE_PATH", "mock_data/emails.json")
-MOCK_CALENDAR_FILE_PATH_STR: Optional[str] = os.getenv("MOCK_CALENDAR_FILE_PATH", "mock_data/calendar_events.json")
-
-MOCK_EMAIL_FILE_PATH: Optional[Path] = PROJECT_ROOT / MOCK_EMAIL_FILE_PATH_STR if MOCK_EMAIL_FILE_PATH_STR else None
-MOCK_CALENDAR_FILE_PATH: Optional[Path] = PROJECT_ROOT / MOCK_CALENDAR_FILE_PATH_STR if MOCK_CALENDAR_FILE_PATH_STR else None
-
-
-# --- Logging Configuration ---
-LOG_LEVEL_STR: str = os.getenv("LOG_LEVEL", "INFO").upper()
-LOG_LEVEL: int = getattr(logging, LOG_LEVEL_STR, logging.INFO)
-
-# --- Optional Gmail Settings ---
-GMAIL_USER_EMAIL: Optional[str] = os.getenv("GMAIL_USER_EMAIL")
-
 # --- Google OAuth Scopes ---
 # Define required scopes for Google APIs
 GOOGLE_CALENDAR_SCOPES: list[str] = ['https://www.googleapis.com/auth/calendar.readonly']
@@ -54,6 +27,120 @@ ALL_GOOGLE_SCOPES = list(set(GOOGLE_CALENDAR_SCOPES + GOOGLE_GMAIL_SCOPES))
 TOKEN_FILE_PATH: Path = PROJECT_ROOT / 'token.json'
 CREDENTIALS_FILE_PATH: Path = PROJECT_ROOT / 'credentials.json' # Expected location for downloaded OAuth client secrets file
 
+
+@dataclass(frozen=True)
+class Settings:
+    """Settings read from the environment (and the project's .env file)."""
+    # --- Google API Credentials ---
+    GOOGLE_CLIENT_ID: Optional[str]
+    GOOGLE_CLIENT_SECRET: Optional[str]
+    GOOGLE_PROJECT_ID: Optional[str]
+
+    # --- External API Keys ---
+    GOOGLE_MAPS_API_KEY: Optional[str]
+    OPENWEATHERMAP_API_KEY: Optional[str]
+
+    # --- Mock Data Paths ---
+    MOCK_EMAIL_FILE_PATH_STR: Optional[str]
+    MOCK_CALENDAR_FILE_PATH_STR: Optional[str]
+    MOCK_EMAIL_FILE_PATH: Optional[Path]
+    MOCK_CALENDAR_FILE_PATH: Optional[Path]
+
+    # --- Planner Defaults ---
+    # Working hours (24h clock) used when looking for free time slots
+    WORKING_HOURS_START: int
+    WORKING_HOURS_END: int
+
+    # --- Logging Configuration ---
+    LOG_LEVEL_STR: str
+    LOG_LEVEL: int
+
+    # --- Optional Gmail Settings ---
+    GMAIL_USER_EMAIL: Optional[str]
+
+
+def _parse_hour(env: dict[str, str], name: str, default: str) -> int:
+    """
+    Reads an hour of the day (24h clock) from the environment.
+
+    Hours are combined into `datetime.time` values, so 0-23 is the valid range.
+
+    Raises:
+        ValueError: If the value is not an integer or lies outside 0-23.
+    """
+    raw_value = env.get(name, default)
+    try:
+        hour = int(raw_value)
+    except ValueError:
+        raise ValueError(f"Invalid configuration: {name} must be an integer hour (0-23), got {raw_value!r}.") from None
+    if not 0 <= hour <= 23:
+        raise ValueError(f"Invalid configuration: {name} must be between 0 and 23, got {hour}.")
+    return hour
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Loads the .env file and reads all settings, once per process.
+
+    Deferred until first use so importing a submodule does not parse .env.
+    A failed load raises and is not cached, so the next call re-reads the environment.
+
+    Returns:
+        Settings: The application settings.
+
+    Raises:
+        ValueError: If WORKING_HOURS_START / WORKING_HOURS_END are not valid
+                    hours or START is not before END.
+    """
+    # Load environment variables from .env file located in the project root
+    dotenv_path = PROJECT_ROOT / '.env'
+    load_dotenv(dotenv_path=dotenv_path)
+
+    # Snapshot the environment once (after .env is applied) and read settings from it
+    env: dict[str, str] = dict(os.environ)
+
+    # Construct absolute paths from relative paths defined in .env
+    mock_email_path_str = env.get("MOCK_EMAIL_FILE_PATH", "mock_data/emails.json")
+    mock_calendar_path_str = env.get("MOCK_CALENDAR_FILE_PATH", "mock_data/calendar_events.json")
+    log_level_str = env.get("LOG_LEVEL", "INFO").upper()
+
+    working_hours_start = _parse_hour(env, "WORKING_HOURS_START", "9")
+    working_hours_end = _parse_hour(env, "WORKING_HOURS_END", "17")
+    if working_hours_start >= working_hours_end:
+        raise ValueError(
+            f"Invalid configuration: WORKING_HOURS_START ({working_hours_start}) must be "
+            f"earlier than WORKING_HOURS_END ({working_hours_end})."
+        )
+
+    return Settings(
+        GOOGLE_CLIENT_ID=env.get("GOOGLE_CLIENT_ID"),
+        GOOGLE_CLIENT_SECRET=env.get("GOOGLE_CLIENT_SECRET"),
+        GOOGLE_PROJECT_ID=env.get("GOOGLE_PROJECT_ID"),
+        GOOGLE_MAPS_API_KEY=env.get("GOOGLE_MAPS_API_KEY"),
+        OPENWEATHERMAP_API_KEY=env.get("OPENWEATHERMAP_API_KEY"),
+        MOCK_EMAIL_FILE_PATH_STR=mock_email_path_str,
+        MOCK_CALENDAR_FILE_PATH_STR=mock_calendar_path_str,
+        MOCK_EMAIL_FILE_PATH=PROJECT_ROOT / mock_email_path_str if mock_email_path_str else None,
+        MOCK_CALENDAR_FILE_PATH=PROJECT_ROOT / mock_calendar_path_str if mock_calendar_path_str else None,
+        WORKING_HOURS_START=working_hours_start,
+        WORKING_HOURS_END=working_hours_end,
+        LOG_LEVEL_STR=log_level_str,
+        LOG_LEVEL=getattr(logging, log_level_str, logging.INFO),
+        GMAIL_USER_EMAIL=env.get("GMAIL_USER_EMAIL"),
+    )
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Keeps `settings.X` access working by proxying unknown names to get_settings().
+
+    Prefer `get_settings().X` in new code; it skips this module-level fallback.
+    """
+    if name in Settings.__dataclass_fields__:
+        return getattr(get_settings(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # --- Validation (Optional but recommended) ---
 # You could add checks here to ensure critical variables are set,
 # raising an informative error if something is missing.
@@ -64,18 +151,32 @@ CREDENTIALS_FILE_PATH: Path = PROJECT_ROOT / 'credentials.json' # Expected locat
 #     logging.warning("OPENWEATHERMAP_API_KEY not set. Weather features will be disabled.")
 
 
-# --- Basic Logging Setup ---
-# Configure root logger
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-# Get a logger instance for this module
-logger = logging.getLogger(__name__)
-logger.info(f"Configuration loaded. Log level set to {LOG_LEVEL_STR}.")
-logger.debug(f"Project Root: {PROJECT_ROOT}")
-logger.debug(f"Mock Email Path: {MOCK_EMAIL_FILE_PATH}")
-logger.debug(f"Mock Calendar Path: {MOCK_CALENDAR_FILE_PATH}")
-logger.debug(f"Token File Path: {TOKEN_FILE_PATH}")
-logger.debug(f"Credentials File Path: {CREDENTIALS_FILE_PATH}")
\ No newline at end of file
+_logging_configured = False
+
+def configure_logging(debug: bool = False) -> None:
+    """
+    Configures the root logger once per process; later calls are no-ops.
+
+    Args:
+        debug (bool): Use DEBUG instead of the configured LOG_LEVEL.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+    config = get_settings()
+    # --- Basic Logging Setup ---
+    # Configure root logger
+    logging.basicConfig(
+        level=logging.DEBUG if debug else config.LOG_LEVEL,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    # Get a logger instance for this module
+    logger = logging.getLogger(__name__)
+    logger.info(f"Configuration loaded. Log level set to {'DEBUG' if debug else config.LOG_LEVEL_STR}.")
+    logger.debug(f"Project Root: {PROJECT_ROOT}")
+    logger.debug(f"Mock Email Path: {config.MOCK_EMAIL_FILE_PATH}")
+    logger.debug(f"Mock Calendar Path: {config.MOCK_CALENDAR_FILE_PATH}")
+    logger.debug(f"Token File Path: {TOKEN_FILE_PATH}")
+    logger.debug(f"Credentials File Path: {CREDENTIALS_FILE_PATH}")
@@ -1,22 +1,23 @@
 # smart_planner/main.py
 """Main entry point for the Smart Personal Planning Assistant."""
 
+import argparse
+import asyncio
+import functools
+import heapq
 import logging
+import operator
+import sys
 import json
-import argparse
-from datetime import date, datetime, time, timedelta
-from typing import List, Optional, Union
+import orjson
+from datetime import date, time
+from typing import List, Optional, Tuple, Union
 
-# Configure logging before importing other modules that might log
-# Ensure settings are loaded first to get LOG_LEVEL
-from .config import settings # noqa sets up logging via basicConfig in settings
+# Settings (and .env) load lazily; entry points call configure_logging() first
+from .config.settings import configure_logging
 
-from google.adk.sessions.state import State as SessionState # Use alias for minimal code change
-from google.adk.models.google_llm import Gemini # Use the Gemini LLM implementation
-
-from .agents.calendar_agent import CalendarAgent
-from .agents.email_agent import EmailAgent
-from .agents.context_agent import ContextAgent
+# google.adk and the agents (which import it) are imported inside the functions
+# that run the planner, so `--help` and argument errors never pay for them
 from .models.schemas import (
     CalendarSummaryOutput, PrioritizedTaskListOutput, ContextOutput,
     ConsolidatedDailyPlanOutput, PlanItem, CalendarEvent, EmailTask, ContextRecommendation
@@ -24,6 +25,10 @@ from .models.schemas import (
 
 logger = logging.getLogger(__name__)
 
+MINUTES_PER_DAY = 24 * 60
+# Chronological sort key for PlanItems (a C-level getter instead of a lambda)
+_BY_TIME = operator.attrgetter("time")
+
 def combine_agent_outputs(
     target_date: date,
     calendar_summary: Optional[CalendarSummaryOutput],
@@ -42,18 +47,21 @@ def combine_agent_outputs(
     Returns:
         A ConsolidatedDailyPlanOutput object.
     """
-    plan_items: List[PlanItem] = []
+    # Each source is collected separately, then merged (see below)
+    event_items: List[PlanItem] = []
+    task_items: List[PlanItem] = []
+    recommendation_items: List[PlanItem] = []
     logger.debug("Combining agent outputs...")
 
     # Add calendar events
     if calendar_summary:
-        logger.debug(f"Adding {len(calendar_summary.events)} calendar events.")
+        logger.debug("Adding %d calendar events.", len(calendar_summary.events))
         for event in calendar_summary.events:
             try:
                 # Ensure time is extracted correctly, handling potential naive/aware issues if necessary
                 # Use start_time directly which should be timezone-aware if possible
                 event_time = event.start_time.time()
-                plan_items.append(PlanItem(
+                event_items.append(PlanItem.model_construct(
                     time=event_time,
                     item_type="event",
                     details=event # Store the full event object
@@ -64,24 +72,25 @@ def combine_agent_outputs(
 
     # Add prioritized tasks (needs scheduling logic - basic version: add without specific time)
     if task_list:
-        logger.debug(f"Adding {len(task_list.tasks)} tasks.")
+        logger.debug("Adding %d tasks.", len(task_list.tasks))
         # Simple approach: Add tasks with a placeholder time or group them
         # Sort by priority: urgent > high > medium > low
-        priority_order = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
-        sorted_tasks = sorted(task_list.tasks, key=lambda t: priority_order.get(t.priority, 99))
+        sorted_tasks = sorted(task_list.tasks, key=operator.attrgetter("priority_rank"))
 
         # Assign placeholder times, trying to fit into morning/afternoon based on priority
         # This is very basic - a real scheduler is needed for proper time allocation
         task_times = [time(9, 0), time(11, 0), time(14, 0), time(16, 0)] # Example slots
+        # Work in minutes since midnight so no datetime objects are needed per task
+        task_minutes = [slot.hour * 60 + slot.minute for slot in task_times]
         time_idx = 0
         for task in sorted_tasks:
-             # Assign a time, cycling through placeholders
-             assigned_time = task_times[time_idx % len(task_times)]
-             # Add some minutes based on index to avoid exact time collisions in the list
-             assigned_time = (datetime.combine(date.today(), assigned_time) + timedelta(minutes=time_idx)).time()
+             # Assign a time, cycling through placeholders, plus some minutes based on
+             # index to avoid exact time collisions in the list (wrapping past midnight)
+             total_minutes = (task_minutes[time_idx % len(task_minutes)] + time_idx) % MINUTES_PER_DAY
+             assigned_time = time(total_minutes // 60, total_minutes % 60)
              time_idx += 1
 
-             plan_items.append(PlanItem(
+             task_items.append(PlanItem.model_construct(
                  time=assigned_time, # Assign placeholder time - needs improvement
                  item_type="task",
                  details=task,
@@ -90,12 +99,12 @@ def combine_agent_outputs(
 
     # Add context recommendations
     if context_info:
-        logger.debug(f"Adding {len(context_info.recommendations)} recommendations.")
+        logger.debug("Adding %d recommendations.", len(context_info.recommendations))
         for rec in context_info.recommendations:
              try:
                 # Use impact time if available, otherwise a default time (e.g., morning)
                 rec_time = rec.impact_time.time() if rec.impact_time else time(7, 0)
-                plan_items.append(PlanItem(
+                recommendation_items.append(PlanItem.model_construct(
                     time=rec_time,
                     item_type="recommendation",
                     details=rec # Store the full recommendation object
@@ -104,16 +113,24 @@ def combine_agent_outputs(
                  logger.warning(f"Could not process recommendation for plan: {e}")
 
 
-    # Sort the combined list chronologically
-    plan_items.sort(key=lambda item: item.time)
-    logger.debug(f"Total plan items after combining: {len(plan_items)}")
+    # Merge the sources chronologically. Events arrive sorted by start, so sorting
+    # them is a linear pass; placeholder task times cycle through the slots and
+    # need a real sort. Ties keep the events, tasks, recommendations order.
+    plan_items: List[PlanItem] = list(heapq.merge(
+        sorted(event_items, key=_BY_TIME),
+        sorted(task_items, key=_BY_TIME),
+        sorted(recommendation_items, key=_BY_TIME),
+        key=_BY_TIME
+    ))
+    logger.debug("Total plan items after combining: %d", len(plan_items))
 
 
-    # Create the final output object
-    final_plan = ConsolidatedDailyPlanOutput(
+    # Create the final output object. Every part is an already-validated model and
+    # the plan is sorted above, so construct without re-validating or re-sorting.
+    final_plan = ConsolidatedDailyPlanOutput.model_construct(
         date=target_date,
         plan=plan_items,
-        summary=f"Plan for {target_date.strftime('%Y-%m-%d')}. "
+        summary=f"Plan for {target_date.isoformat()}. "
                 f"Events: {len(calendar_summary.events) if calendar_summary else 0}. "
                 f"Tasks: {len(task_list.tasks) if task_list else 0}. "
                 f"Recommendations: {len(context_info.recommendations) if context_info else 0}."
@@ -123,10 +140,60 @@ def combine_agent_outputs(
     return final_plan
 
 
-def run_planner(target_date_str: str, use_mock_data: bool = True) -> Optional[ConsolidatedDailyPlanOutput]:
+@functools.lru_cache(maxsize=1)
+def _get_llm_provider():
+    """
+    Creates the Gemini LLM provider once per process.
+
+    Returns:
+        Gemini: The LLM provider shared by all planner runs.
+    """
+    from google.adk.models.google_llm import Gemini # Use the Gemini LLM implementation
+
+    # Use a concrete LLM provider like GoogleLlm
+    # Requires GOOGLE_API_KEY in .env or Application Default Credentials
+    # Using flash as it's often available and cost-effective
+    return Gemini(model="gemini-1.5-flash-latest") # Instantiate Gemini
+
+
+# Only the LLM provider is shared across runs. The agents are cheap wrappers that
+# hold their run's session state, so each run builds its own: concurrent ADK Web
+# requests share one event loop (and the agents' to_thread workers), and a shared
+# agent would be rebound to another request's session mid-run.
+def _build_agents(session_state) -> Tuple["CalendarAgent", "EmailAgent", "ContextAgent"]:
+    """
+    Builds a fresh set of agents bound to the given session state.
+
+    Args:
+        session_state: The SessionState for the current run.
+
+    Returns:
+        The (CalendarAgent, EmailAgent, ContextAgent) instances.
+    """
+    from .agents.calendar_agent import CalendarAgent
+    from .agents.email_agent import EmailAgent
+    from .agents.context_agent import ContextAgent
+
+    llm_provider = _get_llm_provider() # Shared by every run in this process
+    agents = (
+        CalendarAgent(llm_provider=llm_provider, session_state=session_state),
+        EmailAgent(llm_provider=llm_provider, session_state=session_state),
+        ContextAgent(llm_provider=llm_provider, session_state=session_state),
+    )
+    logger.info("Initialized Agents: Calendar, Email, Context")
+    return agents
+
+
+async def run_planner(target_date_str: str, use_mock_data: bool = True) -> Optional[ConsolidatedDailyPlanOutput]:
     """
     Initializes agents and runs the planning sequence.
 
+    Async so it can be awaited from an already running event loop (e.g. the ADK
+    web runner); synchronous entry points wrap it in `asyncio.run`. The blocking
+    Calendar and Email `invoke` calls run in worker threads and start together;
+    the Context Agent is awaited on the loop as soon as the calendar summary it
+    depends on is ready, overlapping whatever is left of the Email Agent.
+
     Args:
         target_date_str: The target date in YYYY-MM-DD format.
         use_mock_data: Whether to use mock data for all agents.
@@ -134,6 +201,7 @@ def run_planner(target_date_str: str, use_mock_data: bool = True) -> Optional[Co
     Returns:
         The final ConsolidatedDailyPlanOutput or None if a critical error occurs.
     """
+    configure_logging() # No-op if an entry point already did it
     logger.info(f"Starting Smart Planner for date: {target_date_str}, Use Mock Data: {use_mock_data}")
 
     try:
@@ -142,61 +210,67 @@ def run_planner(target_date_str: str, use_mock_data: bool = True) -> Optional[Co
         logger.error(f"Invalid date format: {target_date_str}. Please use YYYY-MM-DD.")
         return None
 
+    from google.adk.sessions.state import State as SessionState # Use alias for minimal code change
+
     # --- ADK Setup ---
-    # Use a concrete LLM provider like GoogleLlm
-    # Requires GOOGLE_API_KEY in .env or Application Default Credentials
-    # Using flash as it's often available and cost-effective
-    llm_provider = Gemini(model="gemini-1.5-flash-latest") # Instantiate Gemini
+    # Session state is per run so one request never sees another's results
     session_state = SessionState()
     logger.info("Initialized SessionState.")
 
     # --- Agent Initialization ---
-    calendar_agent = CalendarAgent(llm_provider=llm_provider, session_state=session_state)
-    email_agent = EmailAgent(llm_provider=llm_provider, session_state=session_state)
-    context_agent = ContextAgent(llm_provider=llm_provider, session_state=session_state)
-    logger.info("Initialized Agents: Calendar, Email, Context")
+    calendar_agent, email_agent, context_agent = _build_agents(session_state)
 
     # --- Agent Invocation Sequence ---
     calendar_summary: Optional[CalendarSummaryOutput] = None
     task_list: Optional[PrioritizedTaskListOutput] = None
     context_info: Optional[ContextOutput] = None
 
-    # 1. Calendar Agent
-    logger.info("--- Invoking Calendar Agent ---")
-    calendar_input = {"date_str": target_date_str, "use_mock_data": use_mock_data}
-    try:
-        calendar_summary = calendar_agent.invoke(calendar_input)
-        # Check if invoke returned a valid object (it returns empty on error)
-        if not calendar_summary or calendar_summary.summary_date != target_date: # Renamed from 'date'
-             logger.error("Calendar Agent did not return a valid summary.")
-             # Decide if this is critical - perhaps stop? For now, continue.
-             calendar_summary = None # Ensure it's None if invalid
-        else:
-             logger.info(f"Calendar Agent finished. Found {len(calendar_summary.events)} events.")
-    except Exception as e:
-        logger.exception("Calendar Agent invocation failed catastrophically.")
-        # Potentially stop execution here depending on requirements
-        return None # Stop if calendar fails badly
-
-    # 2. Email Agent
-    logger.info("--- Invoking Email Agent ---")
+    # 1 & 2. Calendar and Email Agents are independent, so start them together
+    logger.info("--- Invoking Calendar and Email Agents ---")
+    calendar_input = {"target_date": target_date, "use_mock_data": use_mock_data} # Already parsed above
     email_input = {"use_mock_data": use_mock_data}
+    calendar_task = asyncio.create_task(asyncio.to_thread(calendar_agent.invoke, calendar_input))
+    email_task = asyncio.create_task(asyncio.to_thread(email_agent.invoke, email_input))
+
     try:
-        task_list = email_agent.invoke(email_input)
-        logger.info(f"Email Agent finished. Found {len(task_list.tasks)} tasks.")
+        calendar_summary = await calendar_task
     except Exception as e:
-        logger.exception("Email Agent invocation failed.")
-        # Continue even if email fails? Assume yes for now.
+        logger.error("Calendar Agent invocation failed catastrophically.", exc_info=e)
+        # Wait out the Email Agent before bailing: its worker thread cannot be cancelled,
+        # and awaiting it also retrieves any exception it raised
+        await asyncio.gather(email_task, return_exceptions=True)
+        return None # Stop if calendar fails badly
+    # Check if invoke returned a valid object (it returns empty on error)
+    if not calendar_summary or calendar_summary.summary_date != target_date: # Renamed from 'date'
+         logger.error("Calendar Agent did not return a valid summary.")
+         # Decide if this is critical - perhaps stop? For now, continue.
+         calendar_summary = None # Ensure it's None if invalid
+    else:
+         logger.info(f"Calendar Agent finished. Found {len(calendar_summary.events)} events.")
 
-    # 3. Context Agent (relies on calendar summary from session state)
+    # 3. Context Agent (relies on the calendar summary), overlapping the Email Agent
     logger.info("--- Invoking Context Agent ---")
     context_input = {}
-    try:
-        context_info = context_agent.invoke(context_input)
-        logger.info(f"Context Agent finished. Generated {len(context_info.recommendations)} recommendations.")
-    except Exception as e:
-        logger.exception("Context Agent invocation failed.")
+    if calendar_summary:
+        # Hand over the validated summary so it is not re-parsed from session state
+        context_input["calendar_summary"] = calendar_summary
+    context_task = asyncio.create_task(context_agent.ainvoke(context_input)) # Async agent, runs on this loop
+
+    email_result, context_result = await asyncio.gather(email_task, context_task, return_exceptions=True)
+
+    if isinstance(email_result, Exception):
+        logger.error("Email Agent invocation failed.", exc_info=email_result)
+        # Continue even if email fails? Assume yes for now.
+    else:
+        task_list = email_result
+        logger.info(f"Email Agent finished. Found {len(task_list.tasks)} tasks.")
+
+    if isinstance(context_result, Exception):
+        logger.error("Context Agent invocation failed.", exc_info=context_result)
         # Continue even if context fails? Assume yes for now.
+    else:
+        context_info = context_result
+        logger.info(f"Context Agent finished. Generated {len(context_info.recommendations)} recommendations.")
 
 
     # --- Combine Results ---
@@ -206,6 +280,17 @@ def run_planner(target_date_str: str, use_mock_data: bool = True) -> Optional[Co
     return final_plan
 
 
+def _plan_to_json(final_plan: ConsolidatedDailyPlanOutput) -> bytes:
+    """
+    Serializes the plan as indented UTF-8 JSON via orjson.
+
+    Produces the same text as `model_dump_json(indent=2)`; OPT_UTC_Z keeps UTC
+    datetimes rendered with a trailing 'Z' like pydantic does. Returned as bytes
+    so files and stdout can be written without a decode/encode round trip.
+    """
+    return orjson.dumps(final_plan.model_dump(), option=orjson.OPT_INDENT_2 | orjson.OPT_UTC_Z)
+
+
 # --- Main Execution & ADK Web Integration ---
 
 def main():
@@ -236,28 +321,33 @@ def main():
 
 
     args = parser.parse_args()
-
-    # Adjust log level if debug flag is set
+    # Apply the debug flag in the one and only logging setup
+    configure_logging(debug=args.debug)
     if args.debug:
-        logging.getLogger().setLevel(logging.DEBUG)
-        for handler in logging.getLogger().handlers:
-            handler.setLevel(logging.DEBUG)
         logger.info("Debug logging enabled.")
 
     use_mock = not args.api
 
-    final_plan = run_planner(target_date_str=args.date, use_mock_data=use_mock)
+    final_plan = asyncio.run(run_planner(target_date_str=args.date, use_mock_data=use_mock))
 
     if final_plan:
         logger.info("--- Consolidated Daily Plan ---")
         try:
-            final_plan_json = final_plan.model_dump_json(indent=2)
-            print(final_plan_json) # Print to console
+            final_plan_json = _plan_to_json(final_plan) # Serialized once for print and --output
+            # Print to console; write the bytes directly unless stdout was replaced by a text-only stream
+            stdout_buffer = getattr(sys.stdout, "buffer", None)
+            if stdout_buffer is not None:
+                sys.stdout.flush()
+                stdout_buffer.write(final_plan_json)
+                stdout_buffer.write(b"\n")
+                stdout_buffer.flush()
+            else:
+                print(final_plan_json.decode())
             logger.info("Final plan generated and printed.")
 
             if args.output:
                 try:
-                    with open(args.output, "w") as f:
+                    with open(args.output, "wb") as f:
                         f.write(final_plan_json)
                     logger.info(f"Saved plan to {args.output}")
                 except IOError as e:
@@ -275,20 +365,21 @@ try:
     from adk.web import adk_agent
 
     @adk_agent
-    def smart_planner_agent(input_json: str) -> str:
+    async def smart_planner_agent(input_json: str) -> str:
         """ADK Web entry point."""
+        configure_logging()
         logger.info("Received request via ADK Web.")
         try:
             input_data = json.loads(input_json)
             target_date = input_data.get("date", date.today().isoformat())
             use_mock = input_data.get("use_mock", True)
-            logger.debug(f"ADK Web input: date={target_date}, use_mock={use_mock}")
+            logger.debug("ADK Web input: date=%s, use_mock=%s", target_date, use_mock)
 
-            final_plan = run_planner(target_date_str=target_date, use_mock_data=use_mock)
+            final_plan = await run_planner(target_date_str=target_date, use_mock_data=use_mock)
 
             if final_plan:
                 logger.info("ADK Web request processed successfully.")
-                return final_plan.model_dump_json(indent=2)
+                return _plan_to_json(final_plan).decode()
             else:
                 logger.error("ADK Web request failed during planner execution.")
                 return json.dumps({"error": "Planner execution failed."})
@@ -1,115 +1,203 @@
 # smart_planner/models/schemas.py
 """Pydantic models for data validation and serialization."""
 
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Literal, Union
+import functools
+import logging
+import operator
+import sys
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
+from typing import Any, Callable, Dict, List, Optional, Literal, Union
+import datetime as dt
 from datetime import datetime, date, time
 
+# Every model is frozen: instances are shared through the tool caches and session
+# reuse, so accidental mutation would leak between requests. Models filled from API
+# responses or mock files ignore unknown keys; models only this code builds forbid them.
+_EXTERNAL_MODEL_CONFIG = ConfigDict(frozen=True)
+_INTERNAL_MODEL_CONFIG = ConfigDict(frozen=True, extra='forbid')
+
 # --- Calendar Agent Models ---
 
+# Python 3.11+ fromisoformat accepts a trailing 'Z' itself
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_datetime(value: str) -> datetime:
+    """Parses an ISO datetime string; identical strings (e.g. templated mock events) parse once."""
+    if not _FROMISOFORMAT_ACCEPTS_Z and value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
 class CalendarEvent(BaseModel):
     """Represents a single event retrieved from Google Calendar."""
+    model_config = _EXTERNAL_MODEL_CONFIG
     start_time: datetime = Field(..., description="Start time of the event")
     end_time: datetime = Field(..., description="End time of the event")
     summary: str = Field(..., description="Event title or summary")
     location: Optional[str] = Field(None, description="Event location, if available")
 
-    @validator('start_time', 'end_time', pre=True, always=True)
+    @field_validator('start_time', 'end_time', mode='before')
+    @classmethod
     def parse_datetime(cls, value):
         """Ensure datetime objects are timezone-aware or handle string parsing if needed."""
         # Basic handling, assumes ISO format or datetime objects already
+        if value.__class__ is datetime:
+            return value # Common case for API/model inputs; skip the checks below
         if isinstance(value, str):
             try:
                 # Attempt to parse common ISO formats
-                return datetime.fromisoformat(value.replace('Z', '+00:00'))
+                return _parse_iso_datetime(value)
             except ValueError:
                 raise ValueError(f"Invalid datetime format: {value}")
         elif isinstance(value, datetime):
             # Ensure timezone awareness if needed, or handle naive datetimes appropriately
             # For simplicity here, we assume correct datetime objects are passed
             return value
-        raise TypeError("datetime must be a string or datetime object")
+        # ValueError (not TypeError) so pydantic reports it as a ValidationError for this field
+        raise ValueError("datetime must be a string or datetime object")
 
 class FreeTimeSlot(BaseModel):
     """Represents a block of free time in the schedule."""
+    model_config = _INTERNAL_MODEL_CONFIG
     start_time: datetime = Field(..., description="Start of the free slot")
     end_time: datetime = Field(..., description="End of the free slot")
     duration_minutes: int = Field(..., description="Duration of the free slot in minutes")
 
 class CalendarConflict(BaseModel):
     """Represents a potential conflict between events."""
+    model_config = _INTERNAL_MODEL_CONFIG
     conflicting_events: List[CalendarEvent] = Field(..., description="List of events that overlap")
     details: str = Field(..., description="Description of the conflict")
 
 class CalendarSummaryOutput(BaseModel):
     """Structured output from the Calendar Agent."""
+    model_config = _INTERNAL_MODEL_CONFIG
     summary_date: date = Field(..., description="The date for which the schedule is summarized") # Renamed from 'date'
     events: List[CalendarEvent] = Field(default_factory=list, description="List of scheduled events for the day")
     free_slots: List[FreeTimeSlot] = Field(default_factory=list, description="Identified free time slots")
     conflicts: List[CalendarConflict] = Field(default_factory=list, description="Detected schedule conflicts")
 
+    @field_validator('events', mode='after')
+    @classmethod
+    def sort_events_by_start_time(cls, v):
+        """Ensure events are sorted chronologically so consumers never need to re-sort."""
+        # Sort on one float key per event instead of pairwise datetime comparisons
+        return sorted(v, key=lambda event: event.start_time.timestamp())
+
 # --- Email Agent Models ---
 
+# Sort rank per priority, most urgent first
+_PRIORITY_RANK = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+
 class EmailTask(BaseModel):
     """Represents a task extracted from email content."""
+    model_config = _EXTERNAL_MODEL_CONFIG
     description: str = Field(..., description="Description of the task")
     priority: Literal['low', 'medium', 'high', 'urgent'] = Field(..., description="Priority level assigned to the task")
     due_date: Optional[date] = Field(None, description="Optional due date for the task")
     source_email_id: Optional[str] = Field(None, description="ID of the source email, if applicable")
 
+    @property
+    def priority_rank(self) -> int:
+        """Sort rank of the priority (0 = urgent); a plain property, so it is not serialized."""
+        return _PRIORITY_RANK.get(self.priority, 99)
+
 class PrioritizedTaskListOutput(BaseModel):
     """Structured output from the Email Agent."""
+    model_config = _INTERNAL_MODEL_CONFIG
     tasks: List[EmailTask] = Field(default_factory=list, description="List of prioritized tasks")
 
 # --- Context Agent Models ---
 
 class WeatherInfo(BaseModel):
     """Represents weather information for a specific time or location."""
-    time: Optional[time] = Field(None, description="Time the weather applies to (e.g., for hourly forecast)")
+    model_config = _EXTERNAL_MODEL_CONFIG
+    # dt.time, not time: the field name shadows the type inside the class body
+    time: Optional[dt.time] = Field(None, description="Time the weather applies to (e.g., for hourly forecast)")
     description: str = Field(..., description="Brief weather description (e.g., 'Rain expected')")
     temperature_celsius: Optional[float] = Field(None, description="Temperature in Celsius")
     location: Optional[str] = Field(None, description="Location the weather applies to")
 
 class TrafficInfo(BaseModel):
     """Represents traffic information for a route or area."""
+    model_config = _EXTERNAL_MODEL_CONFIG
     route_description: Optional[str] = Field(None, description="Description of the affected route (e.g., 'Home to Office')")
     delay_minutes: Optional[int] = Field(None, description="Estimated traffic delay in minutes")
-    condition: Literal['light', 'moderate', 'heavy', 'severe'] = Field(..., description="General traffic condition")
+    condition: Literal['light', 'moderate', 'heavy', 'severe', 'unreachable'] = Field(..., description="General traffic condition ('unreachable' if no route exists)")
     recommendation: Optional[str] = Field(None, description="Suggestion based on traffic (e.g., 'Leave 15 minutes earlier')")
 
 class ContextRecommendation(BaseModel):
     """Represents a single recommendation from the Context Agent."""
+    model_config = _INTERNAL_MODEL_CONFIG
     type: Literal['weather', 'traffic', 'general'] = Field(..., description="Type of recommendation")
-    # Use forward references (strings) for types within Union to avoid potential recursion issues
-    details: Union['WeatherInfo', 'TrafficInfo', str] = Field(..., description="Specific details of the recommendation")
+    # Referenced models are defined above, so no forward references (or model_rebuild) are needed
+    details: Union[WeatherInfo, TrafficInfo, str] = Field(..., description="Specific details of the recommendation")
     impact_time: Optional[datetime] = Field(None, description="Time the recommendation is most relevant")
 
 class ContextOutput(BaseModel):
     """Structured output from the Context Agent."""
+    model_config = _INTERNAL_MODEL_CONFIG
     recommendations: List[ContextRecommendation] = Field(default_factory=list, description="List of contextual recommendations")
 
 # --- Consolidated Plan Models ---
 
 class PlanItem(BaseModel):
     """Represents a single item in the consolidated daily plan."""
-    time: time = Field(..., description="Time of the event, task start, or recommendation relevance")
+    model_config = _INTERNAL_MODEL_CONFIG
+    time: dt.time = Field(..., description="Time of the event, task start, or recommendation relevance")
     item_type: Literal['event', 'task', 'recommendation'] = Field(..., description="Type of plan item")
-    details: Union['CalendarEvent', 'EmailTask', 'ContextRecommendation', str] = Field(..., description="Details of the plan item")
+    details: Union[CalendarEvent, EmailTask, ContextRecommendation, str] = Field(..., description="Details of the plan item")
     priority: Optional[Literal['low', 'medium', 'high', 'urgent']] = Field(None, description="Priority, applicable mainly to tasks")
 
 class ConsolidatedDailyPlanOutput(BaseModel):
     """Final structured output combining all agent inputs."""
-    date: date = Field(..., description="The date of the plan")
+    model_config = _INTERNAL_MODEL_CONFIG
+    date: dt.date = Field(..., description="The date of the plan")
     plan: List[PlanItem] = Field(..., description="Chronologically sorted list of plan items for the day")
     summary: Optional[str] = Field(None, description="Optional high-level summary or key highlights")
 
-    @validator('plan')
+    @field_validator('plan', mode='after')
+    @classmethod
     def sort_plan_by_time(cls, v):
         """Ensure the plan items are sorted chronologically."""
-        return sorted(v, key=lambda item: item.time)
-
-# Rebuild models that use forward references
-ContextRecommendation.model_rebuild()
-PlanItem.model_rebuild()
-ContextOutput.model_rebuild() # Rebuild models that contain the updated models
-ConsolidatedDailyPlanOutput.model_rebuild()
\ No newline at end of file
+        return sorted(v, key=operator.attrgetter('time'))
+
+
+# --- List Validation Helpers ---
+
+# Compiled once; validate and serialize whole lists in a single pydantic-core call
+CALENDAR_EVENTS_ADAPTER = TypeAdapter(List[CalendarEvent])
+EMAIL_TASKS_ADAPTER = TypeAdapter(List[EmailTask])
+
+def validate_list_dropping_invalid(adapter: TypeAdapter, items: List[Any], logger: logging.Logger,
+                                   describe: Callable[[Any], str] = lambda item: "item") -> List[Any]:
+    """
+    Validates a list in one pass, dropping (and logging) only the items that fail.
+
+    On a ValidationError the failing indices are taken from the error locations,
+    each is logged as a warning, and the remaining items are re-validated together.
+
+    Args:
+        adapter (TypeAdapter): Adapter for the list type, e.g. CALENDAR_EVENTS_ADAPTER.
+        items (List[Any]): Raw items to validate.
+        logger (logging.Logger): Logger for the skipped-item warnings.
+        describe (Callable[[Any], str]): Names a raw item in the warning.
+
+    Returns:
+        List[Any]: The validated models for every item that passed.
+
+    Raises:
+        ValidationError: If the failure cannot be attributed to individual items.
+    """
+    try:
+        return adapter.validate_python(items)
+    except ValidationError as e:
+        errors_by_index: Dict[int, List[str]] = {}
+        for error in e.errors():
+            if error["loc"] and isinstance(error["loc"][0], int):
+                errors_by_index.setdefault(error["loc"][0], []).append(error["msg"])
+        if not errors_by_index:
+            raise
+        for idx in sorted(errors_by_index):
+            logger.warning(f"Skipping {describe(items[idx])} due to validation error: {'; '.join(errors_by_index[idx])}")
+        return adapter.validate_python([item for idx, item in enumerate(items) if idx not in errors_by_index])
@@ -0,0 +1,11 @@
+# smart_planner/tests/conftest.py
+"""Shared pytest setup for the smart_planner test suite."""
+
+import sys
+from pathlib import Path
+
+# The package uses relative imports, so tests import it as `smart_planner`;
+# make its parent directory importable when pytest runs from inside smart_planner/
+PACKAGE_PARENT = str(Path(__file__).resolve().parent.parent.parent)
+if PACKAGE_PARENT not in sys.path:
+    sys.path.insert(0, PACKAGE_PARENT)
@@ -0,0 +1,123 @@
+# smart_planner/tests/test_calendar.py
+"""Tests for the Calendar API tools, run against a stubbed Calendar service."""
+
+import datetime
+
+import pytest
+
+# calendar_tools imports the Google client libraries at module level
+pytest.importorskip("googleapiclient")
+pytest.importorskip("google_auth_oauthlib")
+
+from smart_planner.tools import calendar_tools
+
+
+class _FakeRequest:
+    def __init__(self, params: dict):
+        self.params = params
+
+
+class _FakeEvents:
+    def list(self, **params) -> _FakeRequest:
+        return _FakeRequest(params)
+
+
+class _FakeBatch:
+    def __init__(self, service: "_FakeService", callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request: _FakeRequest, request_id: str) -> None:
+        self.requests.append((request_id, request))
+
+    def execute(self) -> None:
+        self.service.batch_sizes.append(len(self.requests))
+        for request_id, request in self.requests:
+            day = request.params["timeMin"][:10]
+            if day in self.service.failing_days:
+                self.callback(request_id, None, RuntimeError(f"backend error for {day}"))
+            else:
+                self.callback(request_id, {"items": self.service.items_by_day.get(day, [])}, None)
+
+
+class _FakeService:
+    """Serves events().list results per day and records how requests were batched."""
+
+    def __init__(self, items_by_day: dict, failing_days=()):
+        self.items_by_day = items_by_day
+        self.failing_days = set(failing_days)
+        self.batch_sizes = []
+
+    def events(self) -> _FakeEvents:
+        return _FakeEvents()
+
+    def new_batch_http_request(self, callback) -> _FakeBatch:
+        return _FakeBatch(self, callback)
+
+
+def _api_event(summary: str, day: str, start_hour: int, end_hour: int) -> dict:
+    return {
+        "summary": summary,
+        "start": {"dateTime": f"{day}T{start_hour:02d}:00:00Z"},
+        "end": {"dateTime": f"{day}T{end_hour:02d}:00:00Z"},
+    }
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    service = _FakeService({
+        "2025-04-14": [_api_event("Standup", "2025-04-14", 9, 10), _api_event("Review", "2025-04-14", 14, 15)],
+        "2025-04-15": [_api_event("Planning", "2025-04-15", 10, 11)],
+    }, failing_days={"2025-04-17"})
+    monkeypatch.setattr(calendar_tools, "get_google_credentials", lambda: object())
+    monkeypatch.setattr(calendar_tools, "_get_calendar_service", lambda creds: service)
+    return service
+
+
+def test_multi_date_fetch_groups_events_by_date(fake_service):
+    dates = [datetime.date(2025, 4, 14), datetime.date(2025, 4, 15), datetime.date(2025, 4, 16)]
+    events_by_date = calendar_tools.fetch_calendar_events_api_multi(dates)
+
+    assert fake_service.batch_sizes == [3] # One batched round trip
+    assert [event.summary for event in events_by_date[dates[0]]] == ["Standup", "Review"]
+    assert [event.summary for event in events_by_date[dates[1]]] == ["Planning"]
+    assert events_by_date[dates[2]] == []
+
+
+def test_multi_date_fetch_leaves_out_failed_dates(fake_service):
+    dates = [datetime.date(2025, 4, 15), datetime.date(2025, 4, 17)]
+    events_by_date = calendar_tools.fetch_calendar_events_api_multi(dates)
+    assert list(events_by_date) == [datetime.date(2025, 4, 15)]
+
+
+def test_multi_date_fetch_splits_batches_and_deduplicates(fake_service, monkeypatch):
+    monkeypatch.setattr(calendar_tools, "CALENDAR_BATCH_LIMIT", 2)
+    dates = [datetime.date(2025, 4, 14) + datetime.timedelta(days=i) for i in range(3)]
+    events_by_date = calendar_tools.fetch_calendar_events_api_multi(dates + dates)
+
+    assert fake_service.batch_sizes == [2, 1]
+    assert list(events_by_date) == dates
+
+
+def test_multi_date_fetch_without_credentials(monkeypatch):
+    monkeypatch.setattr(calendar_tools, "get_google_credentials", lambda: None)
+    assert calendar_tools.fetch_calendar_events_api_multi([datetime.date(2025, 4, 14)]) is None
+
+
+def test_daily_events_for_a_list_of_dates_use_one_batch(fake_service):
+    events_by_day, status_message = calendar_tools.get_daily_calendar_events(
+        ["2025-04-14", "2025-04-15", "2025-04-17"])
+
+    assert fake_service.batch_sizes == [3]
+    assert list(events_by_day) == ["2025-04-14", "2025-04-15"]
+    assert [event["summary"] for event in events_by_day["2025-04-14"]] == ["Standup", "Review"]
+    assert events_by_day["2025-04-15"][0]["start_time"] == "2025-04-15T10:00:00Z"
+    assert "3 events for 2 of 3 dates" in status_message
+
+
+def test_daily_events_for_a_list_with_an_invalid_date(fake_service):
+    events_by_day, status_message = calendar_tools.get_daily_calendar_events(["2025-04-14", "April 15"])
+    assert events_by_day is None
+    assert "Invalid date format" in status_message
+    assert fake_service.batch_sizes == []
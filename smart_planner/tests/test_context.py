@@ -0,0 +1,119 @@
+# smart_planner/tests/test_context.py
+"""Tests for the external context tools used by the Context Agent."""
+
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from smart_planner.tools import external_tools
+from smart_planner.tools.external_tools import parse_traffic_data
+
+ORIGIN = "40.7128,-74.0060"
+DESTINATION = "40.7580,-73.9855"
+BASE_DURATION_SEC = 20 * 60
+
+
+def _directions(leg: dict) -> dict:
+    return {"status": "OK", "routes": [{"legs": [leg]}]}
+
+
+def _leg_with_delay(delay_minutes: int) -> dict:
+    return {
+        "duration": {"value": BASE_DURATION_SEC},
+        "duration_in_traffic": {"value": BASE_DURATION_SEC + delay_minutes * 60},
+    }
+
+
+# A delay exactly on a bound stays in the lower condition (bisect_left, not bisect_right)
+@pytest.mark.parametrize("delay_minutes, condition", [
+    (0, "light"),
+    (5, "light"),
+    (6, "moderate"),
+    (15, "moderate"),
+    (16, "heavy"),
+    (30, "heavy"),
+    (31, "severe"),
+])
+def test_traffic_condition_boundaries(delay_minutes, condition):
+    traffic_info = parse_traffic_data(_directions(_leg_with_delay(delay_minutes)), ORIGIN, DESTINATION)
+    assert traffic_info.delay_minutes == delay_minutes
+    assert traffic_info.condition == condition
+    assert traffic_info.route_description == f"{ORIGIN} to {DESTINATION}"
+    if condition != "light":
+        assert f"{delay_minutes} min" in traffic_info.recommendation
+
+
+def test_traffic_faster_than_usual_is_no_delay():
+    traffic_info = parse_traffic_data(_directions(_leg_with_delay(-3)), ORIGIN, DESTINATION)
+    assert traffic_info.delay_minutes == 0
+    assert traffic_info.condition == "light"
+
+
+@pytest.mark.parametrize("leg", [
+    {"duration": None, "duration_in_traffic": None}, # Explicit nulls in the payload
+    {"duration": {"value": BASE_DURATION_SEC}, "duration_in_traffic": None},
+    {"duration": {"value": BASE_DURATION_SEC}}, # Key missing entirely
+])
+def test_traffic_missing_durations(leg):
+    traffic_info = parse_traffic_data(_directions(leg), ORIGIN, DESTINATION)
+    assert traffic_info.delay_minutes is None
+    assert traffic_info.condition == "light"
+    assert traffic_info.recommendation == "Could not determine traffic delay."
+
+
+@pytest.mark.parametrize("directions_data", [
+    None,
+    {"status": "ZERO_RESULTS", "routes": []},
+    {"status": "OK", "routes": []},
+])
+def test_traffic_without_routes(directions_data):
+    assert parse_traffic_data(directions_data, ORIGIN, DESTINATION) is None
+
+
+# --- Response decoding ---
+
+class _FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def fake_weather_api(monkeypatch):
+    """Serves queued weather response bodies and clears the weather caches around the test."""
+    bodies = []
+    monkeypatch.setattr(external_tools.settings, "get_settings",
+                        lambda: SimpleNamespace(OPENWEATHERMAP_API_KEY="test-key"))
+    monkeypatch.setattr(external_tools.http_session, "get",
+                        lambda url, params=None, timeout=None: _FakeResponse(bodies.pop(0)))
+    external_tools.weather_cache.clear()
+    external_tools.stale_weather_cache.clear()
+    yield bodies
+    external_tools.weather_cache.clear()
+    external_tools.stale_weather_cache.clear()
+
+
+def test_malformed_weather_body_raises_and_is_not_cached(fake_weather_api):
+    fake_weather_api.extend([b'{"weather": [{"descr', b'{"weather": [{"description": "clear sky"}]}'])
+
+    with pytest.raises(requests.exceptions.JSONDecodeError):
+        external_tools.get_weather_data(1.0, 2.0)
+    assert len(external_tools.weather_cache) == 0
+
+    # The next call fetches again rather than serving a cached failure
+    assert external_tools.get_weather_data(1.0, 2.0) == {"weather": [{"description": "clear sky"}]}
+    assert len(external_tools.weather_cache) == 1
+
+
+def test_malformed_weather_body_falls_back_to_stale(fake_weather_api):
+    fake_weather_api.extend([b'{"weather": [{"description": "clear sky"}]}', b'<html>truncated'])
+    external_tools.get_weather_data(1.0, 2.0)
+    external_tools.weather_cache.clear() # Expire the fresh entry
+
+    weather, status_message = external_tools.get_current_weather("1.0,2.0")
+    assert weather["description"] == "Clear sky"
+    assert status_message.endswith(f"{external_tools.STALE_STATUS_SUFFIX}.")
@@ -0,0 +1,127 @@
+# smart_planner/tests/test_email.py
+"""Tests for task extraction from emails."""
+
+import logging
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+
+from smart_planner.models.schemas import EMAIL_TASKS_ADAPTER, EmailTask, validate_list_dropping_invalid
+from smart_planner.tools.email_tools import parse_emails_for_tasks
+
+
+def _email(subject="", body="", email_id="email_1"):
+    return {"id": email_id, "sender": "someone@example.com", "subject": subject, "body": body}
+
+
+def _single_task(**email_fields) -> EmailTask:
+    tasks = parse_emails_for_tasks([_email(**email_fields)])
+    assert len(tasks) == 1
+    return tasks[0]
+
+
+# --- Priority ---
+
+@pytest.mark.parametrize("subject, body, expected", [
+    ("FYI: quarterly update", "This is urgent, please read.", "urgent"), # Highest level present wins
+    ("Task list", "An important deadline is coming.", "high"),
+    ("Please review", "fyi, small update attached", "medium"),
+    ("FYI", "New info on the wiki.", "low"),
+    ("Lunch", "See you at noon", "medium"), # No keywords: default
+    ("ASAP", "", "urgent"), # Keywords in the subject alone count
+    ("Hello", "Reply ASAP", "urgent"), # Keywords in the body alone count
+])
+def test_priority_precedence(subject, body, expected):
+    assert _single_task(subject=subject, body=body).priority == expected
+
+
+def test_priority_phrase_spanning_subject_and_body_does_not_match():
+    # Subject and body are scanned separately, so "action" + "required" is not "action required"
+    assert _single_task(subject="Action", body="required for the release").priority == "medium"
+
+
+# --- Due dates ---
+
+def test_due_date_in_subject():
+    assert _single_task(subject="Report due by 2025-05-01", body="Thanks").due_date == date(2025, 5, 1)
+
+
+def test_due_date_in_body():
+    assert _single_task(subject="Report", body="It is due on 2025-05-02.").due_date == date(2025, 5, 2)
+
+
+def test_due_date_in_subject_wins_over_body():
+    task = _single_task(subject="Due before 2025-05-01", body="Actually due by 2025-06-01.")
+    assert task.due_date == date(2025, 5, 1)
+
+
+def test_due_date_requires_due_keyword():
+    assert _single_task(subject="Report by 2025-05-01", body="Send it on 2025-05-02").due_date is None
+
+
+def test_due_date_spanning_subject_and_body_does_not_match():
+    assert _single_task(subject="Report due", body="by 2025-05-01").due_date is None
+
+
+def test_invalid_due_date_is_ignored(caplog):
+    with caplog.at_level(logging.WARNING):
+        task = _single_task(subject="Report due by 2025-13-40", body="")
+    assert task.due_date is None
+    assert "Invalid date format found in email email_1" in caplog.text
+
+
+# --- Description ---
+
+def test_description_is_subject():
+    assert _single_task(subject="Finalize Q2 report", body="Please submit it.").description == "Finalize Q2 report"
+
+
+@pytest.mark.parametrize("subject", ["", None])
+def test_description_falls_back_to_first_action_sentence(subject):
+    task = _single_task(subject=subject, body="Hi team. Please submit the forms! Thanks.")
+    assert task.description == "Please submit the forms"
+
+
+def test_description_falls_back_to_first_sentence_without_action_verb():
+    task = _single_task(subject="", body="Office closed Friday. Enjoy the weekend.")
+    assert task.description == "Office closed Friday"
+
+
+def test_email_without_subject_or_body_yields_no_task():
+    assert parse_emails_for_tasks([_email(subject="", body="")]) == []
+
+
+def test_long_description_is_truncated():
+    assert len(_single_task(subject="x" * 500).description) == 200
+
+
+# --- Validation ---
+
+def test_invalid_rows_are_dropped(caplog):
+    rows = [
+        {"description": "Valid task", "priority": "high", "due_date": None, "source_email_id": "email_1"},
+        {"description": "Bad priority", "priority": "someday", "due_date": None, "source_email_id": "email_2"},
+        {"description": "Bad date", "priority": "low", "due_date": "not-a-date", "source_email_id": "email_3"},
+        {"description": "Also valid", "priority": "low", "due_date": "2025-05-01", "source_email_id": "email_4"},
+    ]
+    with caplog.at_level(logging.WARNING):
+        tasks = validate_list_dropping_invalid(
+            EMAIL_TASKS_ADAPTER, rows, logging.getLogger(__name__),
+            describe=lambda task_data: f"task for email {task_data['source_email_id']}"
+        )
+
+    assert [task.source_email_id for task in tasks] == ["email_1", "email_4"]
+    assert tasks[1].due_date == date(2025, 5, 1)
+    assert "Skipping task for email email_2" in caplog.text
+    assert "Skipping task for email email_3" in caplog.text
+
+
+def test_validation_errors_outside_rows_are_raised():
+    with pytest.raises(ValidationError):
+        validate_list_dropping_invalid(EMAIL_TASKS_ADAPTER, "not a list", logging.getLogger(__name__))
+
+
+def test_parse_emails_for_tasks_keeps_every_valid_email():
+    emails = [_email(subject=f"Task {i}", email_id=f"email_{i}") for i in range(5)]
+    assert [task.source_email_id for task in parse_emails_for_tasks(emails)] == [f"email_{i}" for i in range(5)]
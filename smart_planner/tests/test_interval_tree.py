@@ -0,0 +1,93 @@
+# smart_planner/tests/test_interval_tree.py
+"""Tests for the augmented interval tree used in schedule analysis."""
+
+import random
+
+from smart_planner.tools.interval_tree import IntervalTree
+
+
+def _brute_force_overlapping(intervals, start, end):
+    """Reference implementation: every interval with max(starts) < min(ends), in start order."""
+    matches = [(s, order, value) for order, (s, e, value) in enumerate(intervals)
+               if max(s, start) < min(e, end)]
+    return [value for _, _, value in sorted(matches)]
+
+
+def test_overlapping_matches_brute_force():
+    rng = random.Random(1234)
+    tree = IntervalTree()
+    intervals = []
+    for i in range(300):
+        start = rng.randint(0, 1000)
+        end = start + rng.randint(0, 60)
+        tree.insert(start, end, i, f"event-{i}")
+        intervals.append((start, end, f"event-{i}"))
+
+    for _ in range(300):
+        query_start = rng.randint(-50, 1050)
+        query_end = query_start + rng.randint(-10, 120)
+        assert tree.overlapping(query_start, query_end) == _brute_force_overlapping(
+            intervals, query_start, query_end)
+
+
+def test_iteration_is_in_start_order():
+    tree = IntervalTree()
+    for key, start in enumerate([5, 1, 3, 1, 4]):
+        tree.insert(start, start + 1, key, (start, key))
+    # Equal starts keep insertion order
+    assert list(tree) == [(1, 1), (1, 3), (3, 2), (4, 4), (5, 0)]
+
+
+def test_touching_endpoints_do_not_overlap():
+    tree = IntervalTree()
+    tree.insert(10, 20, "a", "a")
+    assert tree.overlapping(20, 30) == []
+    assert tree.overlapping(0, 10) == []
+    assert tree.overlapping(19, 21) == ["a"]
+
+
+def test_zero_length_intervals_never_overlap():
+    tree = IntervalTree()
+    tree.insert(10, 10, "empty", "empty")
+    tree.insert(5, 15, "wide", "wide")
+    assert tree.overlapping(8, 12) == ["wide"]
+    assert tree.overlapping(12, 12) == []
+    assert tree.overlapping(12, 8) == []
+
+
+def test_duplicate_keys_refresh_value_but_keep_interval():
+    tree = IntervalTree()
+    tree.insert(0, 10, "a", "first")
+    tree.insert(50, 60, "a", "second")
+    assert len(tree) == 1
+    assert "a" in tree
+    assert list(tree) == ["second"]
+    assert tree.overlapping(0, 10) == ["second"]
+    assert tree.overlapping(50, 60) == []
+
+
+def test_identical_intervals_with_distinct_keys_are_kept():
+    tree = IntervalTree()
+    tree.insert(0, 10, ("meeting", 0), "first")
+    tree.insert(0, 10, ("meeting", 1), "second")
+    assert len(tree) == 2
+    assert tree.overlapping(5, 6) == ["first", "second"]
+
+
+def test_keys_after_many_inserts():
+    rng = random.Random(42)
+    tree = IntervalTree()
+    expected = set()
+    for _ in range(1000):
+        key = rng.randint(0, 400) # Plenty of repeats
+        start = rng.random() * 100
+        tree.insert(start, start + 1, key, key)
+        expected.add(key)
+
+    assert tree.keys() == expected
+    assert len(tree) == len(expected)
+    assert sorted(tree) == sorted(expected)
+
+    # keys() returns a copy, so callers cannot corrupt the tree
+    tree.keys().clear()
+    assert len(tree.keys()) == len(expected)
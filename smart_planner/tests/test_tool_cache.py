@@ -0,0 +1,97 @@
+# smart_planner/tests/test_tool_cache.py
+"""Tests for the cached_tool decorator."""
+
+import asyncio
+
+import pytest
+from cachetools import TTLCache
+
+from smart_planner.tools.tool_cache import cached_tool
+
+tool_cache = TTLCache(maxsize=16, ttl=60)
+
+
+class FakeAgent:
+    """Minimal stand-in for an agent exposing cached tool methods."""
+
+    def __init__(self, results=None):
+        self.calls = []
+        self.results = list(results or [])
+
+    def _respond(self, *args):
+        self.calls.append(args)
+        return self.results.pop(0) if self.results else {"args": list(args)}
+
+    @cached_tool(tool_cache)
+    def lookup(self, date_str: str, use_mock_data: bool = False):
+        return self._respond(date_str, use_mock_data)
+
+    @cached_tool(tool_cache)
+    async def alookup(self, date_str: str):
+        await asyncio.sleep(0)
+        return self._respond(date_str)
+
+
+@pytest.fixture(autouse=True)
+def clear_tool_cache():
+    tool_cache.clear()
+    yield
+    tool_cache.clear()
+
+
+def test_sync_hit_and_miss():
+    agent = FakeAgent()
+
+    first = agent.lookup("2025-04-14")
+    assert agent.lookup("2025-04-14") is first # Hit
+    # Positional and keyword calls with defaults applied share one key
+    assert agent.lookup("2025-04-14", False) is first
+    assert agent.lookup(date_str="2025-04-14", use_mock_data=False) is first
+    assert len(agent.calls) == 1
+
+    agent.lookup("2025-04-14", use_mock_data=True) # Miss: different arguments
+    agent.lookup("2025-04-15") # Miss: different date
+    assert len(agent.calls) == 3
+    assert len(tool_cache) == 3
+
+
+def test_async_hit():
+    agent = FakeAgent()
+
+    async def run():
+        return await agent.alookup("2025-04-14"), await agent.alookup("2025-04-14")
+
+    first, second = asyncio.run(run())
+    assert second is first
+    assert len(agent.calls) == 1
+    # The awaited result is cached, not the coroutine
+    assert list(tool_cache.values()) == [first]
+
+
+def test_self_is_excluded_from_key():
+    first_agent, second_agent = FakeAgent(), FakeAgent()
+
+    result = first_agent.lookup("2025-04-14")
+    assert second_agent.lookup("2025-04-14") is result
+    assert len(first_agent.calls) == 1
+    assert second_agent.calls == []
+    assert list(tool_cache.keys()) == [
+        ("FakeAgent.lookup", ("date_str", "2025-04-14"), ("use_mock_data", False))
+    ]
+
+
+def test_error_results_are_not_cached():
+    agent = FakeAgent(results=[
+        {"status": "error", "message": "API unavailable"},
+        {"error": "API unavailable"},
+        {"status": "ok"},
+    ])
+
+    assert agent.lookup("2025-04-14") == {"status": "error", "message": "API unavailable"}
+    assert len(tool_cache) == 0
+    assert agent.lookup("2025-04-14") == {"error": "API unavailable"}
+    assert len(tool_cache) == 0
+    assert agent.lookup("2025-04-14") == {"status": "ok"}
+    assert agent.lookup("2025-04-14") == {"status": "ok"}
+    assert len(agent.calls) == 3
+    assert len(tool_cache) == 1
@@ -2,11 +2,13 @@
 """Tools for interacting with Google Calendar API or mock data."""
 
 import datetime
-import json
 import logging
+import mmap
 import os.path
-from typing import List, Optional, Tuple
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+import orjson
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -15,25 +17,63 @@ from googleapiclient.errors import HttpError
 from pydantic import ValidationError
 
 from ..config import settings
-from ..models.schemas import CalendarEvent
+from ..models.schemas import CalendarEvent, CALENDAR_EVENTS_ADAPTER, validate_list_dropping_invalid
 
 logger = logging.getLogger(__name__)
 
+# Prefer the C ISO 8601 parser; it handles a trailing 'Z' natively
+try:
+    from ciso8601 import parse_datetime as _parse_api_datetime
+except ImportError:
+    def _parse_api_datetime(value: str) -> datetime.datetime:
+        """Parses an RFC 3339 dateTime from the Calendar API with the stdlib parser."""
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        return datetime.datetime.fromisoformat(value)
+
 # --- Google Authentication ---
 
+# Credentials are kept for the whole process and only reloaded/refreshed once invalid
+_cached_credentials: Optional[Credentials] = None
+_credentials_lock = threading.Lock()
+
+# Built Calendar services, per thread (the underlying httplib2 client is not
+# thread-safe) and tied to the credentials object they were built with
+_calendar_services = threading.local()
+
 def get_google_credentials() -> Optional[Credentials]:
     """Gets valid Google OAuth credentials.
 
+    Returns the process-wide cached credentials while they are valid; otherwise
+    loads, refreshes or re-runs the OAuth flow (see `_load_google_credentials`).
+
+    Returns:
+        Optional[Credentials]: Valid credentials object or None if auth fails.
+    """
+    global _cached_credentials
+    with _credentials_lock:
+        creds = _cached_credentials
+        if creds is None or not creds.valid:
+            creds = _load_google_credentials(creds)
+            _cached_credentials = creds
+        return creds
+
+def _load_google_credentials(creds: Optional[Credentials] = None) -> Optional[Credentials]:
+    """Loads or obtains valid Google OAuth credentials.
+
     Handles the OAuth 2.0 flow for installed applications.
     Stores/refreshes tokens in `token.json`.
 
+    Args:
+        creds (Optional[Credentials]): Previously loaded credentials to refresh, if any;
+                                       the token file is only read when this is None.
+
     Returns:
         Optional[Credentials]: Valid credentials object or None if auth fails.
     """
-    creds = None
     # The file token.json stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first time.
-    if settings.TOKEN_FILE_PATH.exists():
+    if creds is None and settings.TOKEN_FILE_PATH.exists():
         try:
             creds = Credentials.from_authorized_user_file(str(settings.TOKEN_FILE_PATH), settings.GOOGLE_CALENDAR_SCOPES)
             logger.info("Loaded credentials from token file.")
@@ -80,11 +120,84 @@ def get_google_credentials() -> Optional[Credentials]:
 
 # --- Calendar API Interaction ---
 
-def fetch_calendar_events_api(target_date: datetime.date) -> Optional[List[CalendarEvent]]:
+def _get_calendar_service(creds: Credentials):
+    """Returns this thread's Calendar service for `creds`, building it only once.
+
+    `build()` parses the API discovery document, so the service is reused for as
+    long as the same credentials object is (refreshes happen in place). The document
+    is read from the copy bundled with googleapiclient rather than fetched over HTTP.
+    """
+    cached = getattr(_calendar_services, "service", None)
+    if cached is not None and cached[0] is creds:
+        return cached[1]
+    service = build("calendar", "v3", credentials=creds, static_discovery=True, cache_discovery=False)
+    _calendar_services.service = (creds, service)
+    return service
+
+# The Calendar API accepts at most 50 calls per batch request
+CALENDAR_BATCH_LIMIT = 50
+
+def _build_events_request(service, target_date: datetime.date, tz: Optional[datetime.tzinfo] = None):
+    """Builds (without executing) the events().list request for one day.
+
+    Without `tz` the day runs from midnight to midnight UTC; pass a tzinfo to bound
+    it by the user's local midnight instead.
+    """
+    # Convert to RFC3339 format which Google API expects
+    if tz is None:
+        day = target_date.isoformat()
+        time_min = f"{day}T00:00:00Z" # 'Z' indicates UTC
+        time_max = f"{day}T23:59:59.999999Z"
+    else:
+        time_min = datetime.datetime.combine(target_date, datetime.time.min, tzinfo=tz).isoformat()
+        time_max = datetime.datetime.combine(target_date, datetime.time.max, tzinfo=tz).isoformat()
+
+    logger.info(f"Fetching events for {target_date} between {time_min} and {time_max}")
+
+    return service.events().list(
+        calendarId="primary", # Use 'primary' for the user's main calendar
+        timeMin=time_min,
+        timeMax=time_max,
+        singleEvents=True, # Expand recurring events
+        orderBy="startTime",
+    )
+
+def _parse_api_event(event: dict) -> Optional[CalendarEvent]:
+    """Converts one raw Calendar API event resource into a CalendarEvent, or None if it is bad."""
+    # Timed events carry 'dateTime', all-day events only 'date'; look each up only when needed
+    start_info = event["start"]
+    end_info = event["end"]
+    start = start_info.get("dateTime") or start_info.get("date")
+    end = end_info.get("dateTime") or end_info.get("date")
+    summary = event.get("summary", "No Title")
+
+    # Handle all-day events vs timed events for datetime parsing
+    try:
+        # Need robust datetime parsing here
+        start_time = _parse_api_datetime(start) if 'T' in start else datetime.datetime.combine(datetime.date.fromisoformat(start), datetime.time.min)
+        end_time = _parse_api_datetime(end) if 'T' in end else datetime.datetime.combine(datetime.date.fromisoformat(end), datetime.time.max)
+        return CalendarEvent(
+            start_time=start_time,
+            end_time=end_time,
+            summary=summary,
+            location=event.get("location"),
+        )
+    except (ValidationError, ValueError, TypeError) as e:
+        logger.warning(f"Skipping event due to parsing error: {summary} ({start}-{end}). Error: {e}")
+    except Exception as e:
+         logger.error(f"Unexpected error parsing event {summary}: {e}")
+    return None
+
+def _parse_api_events(api_events: List[dict]) -> List[CalendarEvent]:
+    """Converts raw Calendar API event resources into CalendarEvent objects, skipping bad ones."""
+    return [parsed for parsed in map(_parse_api_event, api_events) if parsed is not None]
+
+def fetch_calendar_events_api(target_date: datetime.date, tz: Optional[datetime.tzinfo] = None) -> Optional[List[CalendarEvent]]:
     """Fetches calendar events for a specific date using the Google Calendar API.
 
     Args:
         target_date (datetime.date): The date for which to fetch events.
+        tz (Optional[datetime.tzinfo]): Timezone whose midnights bound the day. Defaults to UTC.
 
     Returns:
         Optional[List[CalendarEvent]]: A list of CalendarEvent objects or None if an error occurs.
@@ -95,34 +208,10 @@ def fetch_calendar_events_api(target_date: datetime.date) -> Optional[List[Calen
         return None
 
     try:
-        service = build("calendar", "v3", credentials=creds)
-        logger.info(f"Successfully built Google Calendar service for date: {target_date}")
-
-        # Define the time range for the target date (from midnight to midnight in local timezone)
-        # Assuming local timezone interpretation for the date
-        start_dt = datetime.datetime.combine(target_date, datetime.time.min)
-        end_dt = datetime.datetime.combine(target_date, datetime.time.max)
-
-        # Convert to RFC3339 format which Google API expects (usually UTC)
-        # Adjust timezone handling as needed based on user's calendar settings / requirements
-        # For simplicity, using system's local timezone awareness if available, else assuming UTC
-        time_min = start_dt.isoformat() + 'Z' # 'Z' indicates UTC
-        time_max = end_dt.isoformat() + 'Z' # 'Z' indicates UTC
-        # A more robust solution might involve pytz for explicit timezone handling
-
-        logger.info(f"Fetching events for {target_date} between {time_min} and {time_max}")
-
-        events_result = (
-            service.events()
-            .list(
-                calendarId="primary", # Use 'primary' for the user's main calendar
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True, # Expand recurring events
-                orderBy="startTime",
-            )
-            .execute()
-        )
+        service = _get_calendar_service(creds)
+        logger.info(f"Using Google Calendar service for date: {target_date}")
+
+        events_result = _build_events_request(service, target_date, tz).execute()
         api_events = events_result.get("items", [])
 
         if not api_events:
@@ -131,32 +220,7 @@ def fetch_calendar_events_api(target_date: datetime.date) -> Optional[List[Calen
 
         logger.info(f"Found {len(api_events)} events for {target_date}.")
 
-        parsed_events: List[CalendarEvent] = []
-        for event in api_events:
-            start = event["start"].get("dateTime", event["start"].get("date"))
-            end = event["end"].get("dateTime", event["end"].get("date"))
-            summary = event.get("summary", "No Title")
-            location = event.get("location")
-
-            # Handle all-day events vs timed events for datetime parsing
-            try:
-                # Need robust datetime parsing here
-                start_time = datetime.datetime.fromisoformat(start.replace('Z', '+00:00')) if 'T' in start else datetime.datetime.combine(datetime.date.fromisoformat(start), datetime.time.min)
-                end_time = datetime.datetime.fromisoformat(end.replace('Z', '+00:00')) if 'T' in end else datetime.datetime.combine(datetime.date.fromisoformat(end), datetime.time.max)
-
-                event_data = {
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "summary": summary,
-                    "location": location,
-                }
-                parsed_events.append(CalendarEvent(**event_data))
-            except (ValidationError, ValueError, TypeError) as e:
-                logger.warning(f"Skipping event due to parsing error: {summary} ({start}-{end}). Error: {e}")
-            except Exception as e:
-                 logger.error(f"Unexpected error parsing event {summary}: {e}")
-
-
+        parsed_events = _parse_api_events(api_events)
         logger.info(f"Successfully parsed {len(parsed_events)} events.")
         return parsed_events
 
@@ -168,49 +232,142 @@ def fetch_calendar_events_api(target_date: datetime.date) -> Optional[List[Calen
         logger.error(f"An unexpected error occurred while fetching calendar events: {e}")
         return None
 
-# --- Mock Data Handling ---
+def fetch_calendar_events_api_multi(dates: List[datetime.date], tz: Optional[datetime.tzinfo] = None) -> Optional[Dict[datetime.date, List[CalendarEvent]]]:
+    """Fetches calendar events for several dates using batched Google Calendar API calls.
 
-def load_mock_calendar_events(target_date: datetime.date) -> Optional[List[CalendarEvent]]:
-    """Loads mock calendar events for a specific date from a JSON file.
+    Each day's events().list call is added to a batch request, so N days cost
+    one HTTP round trip per CALENDAR_BATCH_LIMIT days instead of N.
 
     Args:
-        target_date (datetime.date): The date to filter mock events for.
+        dates (List[datetime.date]): The dates for which to fetch events.
+        tz (Optional[datetime.tzinfo]): Timezone whose midnights bound each day. Defaults to UTC.
 
     Returns:
-        Optional[List[CalendarEvent]]: A list of CalendarEvent objects or None if an error occurs.
+        Optional[Dict[datetime.date, List[CalendarEvent]]]: Events per date; a date whose
+            call failed is left out. None if credentials or the batch itself fail.
     """
-    if not settings.MOCK_CALENDAR_FILE_PATH or not settings.MOCK_CALENDAR_FILE_PATH.exists():
-        logger.warning(f"Mock calendar file path not configured or file not found: {settings.MOCK_CALENDAR_FILE_PATH}")
+    creds = get_google_credentials()
+    if not creds:
+        logger.error("Failed to obtain Google credentials. Cannot fetch calendar events via API.")
         return None
 
+    unique_dates = list(dict.fromkeys(dates))
+    dates_by_id = {target_date.isoformat(): target_date for target_date in unique_dates}
+    events_by_date: Dict[datetime.date, List[CalendarEvent]] = {}
+
+    def on_response(request_id: str, response: Optional[dict], exception: Optional[Exception]) -> None:
+        target_date = dates_by_id[request_id]
+        if exception is not None:
+            logger.error(f"An API error occurred for {target_date}: {exception}")
+            return
+        api_events = response.get("items", [])
+        logger.info(f"Found {len(api_events)} events for {target_date}.")
+        events_by_date[target_date] = _parse_api_events(api_events)
+
     try:
-        with open(settings.MOCK_CALENDAR_FILE_PATH, 'r') as f:
-            all_mock_events_data = json.load(f)
+        service = _get_calendar_service(creds)
+        for offset in range(0, len(unique_dates), CALENDAR_BATCH_LIMIT):
+            batch = service.new_batch_http_request(callback=on_response)
+            for target_date in unique_dates[offset:offset + CALENDAR_BATCH_LIMIT]:
+                batch.add(_build_events_request(service, target_date, tz), request_id=target_date.isoformat())
+            batch.execute()
+
+        logger.info(f"Fetched events for {len(events_by_date)} of {len(unique_dates)} dates.")
+        return events_by_date
+
+    except HttpError as error:
+        logger.error(f"An API error occurred: {error}")
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching calendar events: {e}")
+        return None
+
+# --- Mock Data Handling ---
+
+# Parsed mock calendar grouped by start date ('YYYY-MM-DD'), keyed by (path, mtime)
+# so the file is only re-read and re-indexed after it changes
+_mock_calendar_index: Optional[Tuple[Tuple[str, int], Dict[str, List[dict]]]] = None
+
+def _load_mock_calendar_index(mock_calendar_path) -> Dict[str, List[dict]]:
+    """Returns the mock events grouped by start date, re-reading the file only if it changed."""
+    global _mock_calendar_index
+    cache_key = (str(mock_calendar_path), mock_calendar_path.stat().st_mtime_ns)
+    if _mock_calendar_index is not None and _mock_calendar_index[0] == cache_key:
+        return _mock_calendar_index[1]
+
+    with open(mock_calendar_path, 'rb') as f:
+        all_mock_events_data = orjson.loads(f.read())
+    logger.info(f"Loaded mock data from {mock_calendar_path}")
 
-        logger.info(f"Loaded mock data from {settings.MOCK_CALENDAR_FILE_PATH}")
+    events_by_date: Dict[str, List[dict]] = {}
+    for event_data in all_mock_events_data:
+        start_str = event_data.get("start_time")
+        if start_str and isinstance(start_str, str):
+            events_by_date.setdefault(start_str[:10], []).append(event_data)
 
-        # Filter events for the target date and parse them
-        parsed_events: List[CalendarEvent] = []
-        target_date_str = target_date.isoformat()
+    _mock_calendar_index = (cache_key, events_by_date)
+    return events_by_date
 
-        for event_data in all_mock_events_data:
-            start_str = event_data.get("start_time")
-            # Check if the event date matches the target date
-            if start_str and start_str.startswith(target_date_str):
+def _scan_mock_calendar_jsonl(mock_calendar_path, target_date: datetime.date) -> List[dict]:
+    """Returns the target date's events from a JSON Lines mock file (one event per line).
+
+    The file is memory-mapped and lines that never mention the date are skipped
+    unparsed, so only candidate lines pay for JSON decoding. Lines that fail to
+    decode are logged and skipped.
+    """
+    day = target_date.isoformat()
+    day_bytes = day.encode()
+    day_events_data: List[dict] = []
+    with open(mock_calendar_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return day_events_data # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line_number, line in enumerate(iter(mm.readline, b''), start=1):
+                if day_bytes not in line or not line.strip():
+                    continue
                 try:
-                    # Assume ISO format strings in mock data
-                    parsed_event = CalendarEvent(**event_data)
-                    parsed_events.append(parsed_event)
-                except ValidationError as e:
-                    logger.warning(f"Skipping mock event due to validation error: {event_data.get('summary', 'N/A')}. Error: {e}")
-                except Exception as e:
-                    logger.error(f"Unexpected error parsing mock event {event_data.get('summary', 'N/A')}: {e}")
+                    event_data = orjson.loads(line)
+                    start_str = event_data.get("start_time")
+                except (orjson.JSONDecodeError, AttributeError) as e:
+                    # A malformed line (or one that is not a JSON object) only loses that event
+                    logger.warning(f"Skipping invalid line {line_number} in {mock_calendar_path}: {e}")
+                    continue
+                if start_str and isinstance(start_str, str) and start_str[:10] == day:
+                    day_events_data.append(event_data)
+    logger.info(f"Scanned mock data from {mock_calendar_path}")
+    return day_events_data
+
+def load_mock_calendar_events(target_date: datetime.date) -> Optional[List[CalendarEvent]]:
+    """Loads mock calendar events for a specific date from a JSON (or JSON Lines) file.
+
+    Args:
+        target_date (datetime.date): The date to filter mock events for.
+
+    Returns:
+        Optional[List[CalendarEvent]]: A list of CalendarEvent objects or None if an error occurs.
+    """
+    mock_calendar_path = settings.get_settings().MOCK_CALENDAR_FILE_PATH
+    if not mock_calendar_path or not mock_calendar_path.exists():
+        logger.warning(f"Mock calendar file path not configured or file not found: {mock_calendar_path}")
+        return None
+
+    try:
+        # Look up the target date's events, then parse them in one pass
+        if mock_calendar_path.suffix == '.jsonl':
+            day_events_data = _scan_mock_calendar_jsonl(mock_calendar_path, target_date)
+        else:
+            day_events_data = _load_mock_calendar_index(mock_calendar_path).get(target_date.isoformat(), [])
 
+        # Assume ISO format strings in mock data
+        parsed_events: List[CalendarEvent] = validate_list_dropping_invalid(
+            CALENDAR_EVENTS_ADAPTER, day_events_data, logger,
+            describe=lambda event_data: f"mock event '{event_data.get('summary', 'N/A')}'"
+        )
 
         logger.info(f"Found and parsed {len(parsed_events)} mock events for {target_date}.")
         return parsed_events
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Error decoding JSON from mock calendar file: {e}")
         return None
     except Exception as e:
@@ -223,19 +380,26 @@ def load_mock_calendar_events(target_date: datetime.date) -> Optional[List[Calen
 # For modularity, we define the core logic here and will wrap it in an @tool
 # decorator within the CalendarAgent class later.
 
-def get_daily_calendar_events(date_str: str, use_mock_data: bool = False) -> Tuple[Optional[List[dict]], str]:
+def get_daily_calendar_events(date_str: Union[str, Sequence[str]], use_mock_data: bool = False
+                              ) -> Tuple[Optional[Union[List[dict], Dict[str, List[dict]]]], str]:
     """
     Fetches calendar events for a given date, either from Google Calendar API or mock data.
 
     Args:
-        date_str (str): The target date in YYYY-MM-DD format.
+        date_str (Union[str, Sequence[str]]): The target date in YYYY-MM-DD format, or a
+            list of such dates; API fetches for a list share batched requests.
         use_mock_data (bool): If True, uses mock data instead of the API. Defaults to False.
 
     Returns:
-        Tuple[Optional[List[dict]], str]: A tuple containing:
+        Tuple[Optional[Union[List[dict], Dict[str, List[dict]]]], str]: A tuple containing:
             - A list of event dictionaries (Pydantic model .dict()) on success, or None on failure.
+              For a list of dates, a dict of such lists keyed by date string instead; a date
+              that could not be fetched is left out.
             - A status message string.
     """
+    if not isinstance(date_str, str):
+        return _get_calendar_events_for_dates(date_str, use_mock_data)
+
     try:
         target_date = datetime.date.fromisoformat(date_str)
     except ValueError:
@@ -279,7 +443,53 @@ def get_daily_calendar_events(date_str: str, use_mock_data: bool = False) -> Tup
     if events is not None:
         # Convert Pydantic models to dictionaries for ADK tool output if needed
         # ADK might handle Pydantic models directly, check documentation
-        events_dict = [event.model_dump(mode='json') for event in events] # Use model_dump for Pydantic v2+
+        events_dict = CALENDAR_EVENTS_ADAPTER.dump_python(events, mode='json') # Whole list in one call
         return events_dict, status_message
     else:
-        return None, status_message
\ No newline at end of file
+        return None, status_message
+
+def _get_calendar_events_for_dates(date_strs: Sequence[str], use_mock_data: bool = False) -> Tuple[Optional[Dict[str, List[dict]]], str]:
+    """
+    Fetches calendar events for several dates; see `get_daily_calendar_events`.
+
+    API fetches go through `fetch_calendar_events_api_multi`, so the days share
+    batched HTTP requests instead of one round trip each.
+
+    Args:
+        date_strs (Sequence[str]): Target dates in YYYY-MM-DD format.
+        use_mock_data (bool): If True, uses mock data instead of the API. Defaults to False.
+
+    Returns:
+        Tuple[Optional[Dict[str, List[dict]]], str]: Event dictionaries per date string
+            (dates that failed are left out), or None on failure, and a status message.
+    """
+    try:
+        target_dates = list(dict.fromkeys(datetime.date.fromisoformat(date_str) for date_str in date_strs))
+    except (ValueError, TypeError):
+        logger.error(f"Invalid date format provided in: {date_strs}. Use YYYY-MM-DD.")
+        return None, f"Invalid date format in {list(date_strs)}. Please use YYYY-MM-DD."
+
+    logger.info(f"Requesting calendar events for {len(target_dates)} dates, use_mock_data={use_mock_data}")
+
+    events_by_date: Optional[Dict[datetime.date, List[CalendarEvent]]]
+    if use_mock_data:
+        events_by_date = {}
+        for target_date in target_dates:
+            events = load_mock_calendar_events(target_date)
+            if events is not None:
+                events_by_date[target_date] = events
+        source = "mock data"
+    else:
+        events_by_date = fetch_calendar_events_api_multi(target_dates)
+        source = "Google Calendar API"
+
+    if events_by_date is None:
+        status_message = f"Failed to fetch calendar events for {len(target_dates)} dates from {source}. Check logs and credentials."
+        logger.error(status_message)
+        return None, status_message
+
+    status_message = (f"Fetched {sum(map(len, events_by_date.values()))} events for "
+                      f"{len(events_by_date)} of {len(target_dates)} dates from {source}.")
+    logger.info(status_message)
+    return {target_date.isoformat(): CALENDAR_EVENTS_ADAPTER.dump_python(events, mode='json')
+            for target_date, events in events_by_date.items()}, status_message
@@ -1,19 +1,38 @@
 # smart_planner/tools/email_tools.py
 """Tools for processing email data (mock or potentially Gmail API)."""
 
-import json
 import logging
 import re
 from datetime import date, datetime
 from typing import List, Optional, Tuple, Dict, Any
 
-from pydantic import ValidationError
+import orjson
 
 from ..config import settings
-from ..models.schemas import EmailTask
+from ..models.schemas import EmailTask, EMAIL_TASKS_ADAPTER, validate_list_dropping_invalid
 
 logger = logging.getLogger(__name__)
 
+# --- Task Extraction Rules (built once at import) ---
+
+# Simple keyword-based priority assignment (customize as needed). Levels are checked
+# in order with plain substring tests, so the highest priority present wins.
+PRIORITY_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('urgent', ('urgent', 'asap', 'immediately', 'critical')),
+    ('high', ('important', 'priority', 'deadline', 'due soon')),
+    ('medium', ('task', 'action required', 'follow up', 'please review')),
+    ('low', ('fyi', 'update', 'info', 'suggestion')),
+)
+
+# Simple regex for potential due dates (example: "due by YYYY-MM-DD")
+DUE_DATE_PATTERN = re.compile(r'due (?:by|on|before) (\d{4}-\d{2}-\d{2})', re.IGNORECASE)
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]')
+ACTION_VERBS: Tuple[str, ...] = ('complete', 'finish', 'submit', 'review', 'reply', 'send', 'prepare')
+
+def _contains_any(first: str, second: str, keywords: Tuple[str, ...]) -> bool:
+    """Checks both strings for any keyword without concatenating them first."""
+    return any(keyword in first or keyword in second for keyword in keywords)
+
 # --- Mock Email Data Handling ---
 
 def load_mock_emails() -> Optional[List[Dict[str, Any]]]:
@@ -23,16 +42,17 @@ def load_mock_emails() -> Optional[List[Dict[str, Any]]]:
         Optional[List[Dict[str, Any]]]: A list of dictionaries representing emails,
                                          or None if loading fails.
     """
-    if not settings.MOCK_EMAIL_FILE_PATH or not settings.MOCK_EMAIL_FILE_PATH.exists():
-        logger.warning(f"Mock email file path not configured or file not found: {settings.MOCK_EMAIL_FILE_PATH}")
+    mock_email_path = settings.get_settings().MOCK_EMAIL_FILE_PATH
+    if not mock_email_path or not mock_email_path.exists():
+        logger.warning(f"Mock email file path not configured or file not found: {mock_email_path}")
         return None
 
     try:
-        with open(settings.MOCK_EMAIL_FILE_PATH, 'r') as f:
-            mock_emails = json.load(f)
-        logger.info(f"Loaded {len(mock_emails)} mock emails from {settings.MOCK_EMAIL_FILE_PATH}")
+        with open(mock_email_path, 'rb') as f:
+            mock_emails = orjson.loads(f.read())
+        logger.info(f"Loaded {len(mock_emails)} mock emails from {mock_email_path}")
         return mock_emails
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Error decoding JSON from mock email file: {e}")
         return None
     except Exception as e:
@@ -50,35 +70,25 @@ def parse_emails_for_tasks(emails: List[Dict[str, Any]]) -> List[EmailTask]:
     Returns:
         List[EmailTask]: A list of extracted EmailTask objects.
     """
-    tasks: List[EmailTask] = []
     if not emails:
-        return tasks
-
-    # Simple keyword-based priority assignment (customize as needed)
-    priority_keywords = {
-        'urgent': ['urgent', 'asap', 'immediately', 'critical'],
-        'high': ['important', 'priority', 'deadline', 'due soon'],
-        'medium': ['task', 'action required', 'follow up', 'please review'],
-        'low': ['fyi', 'update', 'info', 'suggestion'],
-    }
-
-    # Simple regex for potential due dates (example: "due by YYYY-MM-DD")
-    due_date_pattern = re.compile(r'due (?:by|on|before) (\d{4}-\d{2}-\d{2})', re.IGNORECASE)
+        return []
+    tasks_data: List[Dict[str, Any]] = [] # Validated together after the loop
 
     for email in emails:
         email_id = email.get('id', 'unknown')
-        subject = email.get('subject', '').lower()
-        body = email.get('body', '').lower()
         sender = email.get('sender', 'unknown')
-        content = subject + " " + body # Combine subject and body for keyword search
+        # Lowercase subject and body once for keyword search; they are scanned separately
+        # rather than joined, so long bodies are not copied into a combined string
+        subject_text = (email.get('subject') or '').lower()
+        body_text = (email.get('body') or '').lower()
 
         priority: Optional[str] = None
         description: Optional[str] = None
         due_date: Optional[date] = None
 
         # Determine priority
-        for p_level, keywords in priority_keywords.items():
-            if any(keyword in content for keyword in keywords):
+        for p_level, keywords in PRIORITY_KEYWORDS:
+            if _contains_any(subject_text, body_text, keywords):
                 priority = p_level
                 break
         if not priority:
@@ -87,20 +97,24 @@ def parse_emails_for_tasks(emails: List[Dict[str, Any]]) -> List[EmailTask]:
         # Extract description (simple approach: use subject, or first sentence of body)
         # A more sophisticated approach would involve NLP/LLM summarization
         description = email.get('subject', 'Task from email') # Default to subject
-        if not description and email.get('body'):
+        body = email.get('body')
+        if not description and body:
              # Basic sentence split, take the first one containing a potential action verb
-             sentences = re.split(r'[.!?]', email['body'])
-             action_verbs = ['complete', 'finish', 'submit', 'review', 'reply', 'send', 'prepare']
-             for sentence in sentences:
-                 if sentence.strip() and any(verb in sentence.lower() for verb in action_verbs):
-                     description = sentence.strip()
-                     break
-             if description == email.get('subject', 'Task from email'): # If still default
-                 description = sentences[0].strip() if sentences else 'Task from email'
-
-
-        # Extract due date
-        match = due_date_pattern.search(content)
+             sentences = SENTENCE_SPLIT_PATTERN.split(body)
+             description = next(
+                 (sentence.strip() for sentence in sentences
+                  if sentence.strip() and any(verb in sentence.lower() for verb in ACTION_VERBS)),
+                 sentences[0].strip() # Otherwise fall back to the first sentence
+             )
+
+
+        # Extract due date (subject first); the text is lowercased, so the literal 'due ' is required for a match
+        match = None
+        for text in (subject_text, body_text):
+            if 'due ' in text:
+                match = DUE_DATE_PATTERN.search(text)
+                if match:
+                    break
         if match:
             try:
                 due_date = date.fromisoformat(match.group(1))
@@ -110,20 +124,23 @@ def parse_emails_for_tasks(emails: List[Dict[str, Any]]) -> List[EmailTask]:
         # Create task object if we have a description
         if description:
             try:
-                task_data = {
+                tasks_data.append({
                     "description": description[:200], # Truncate long descriptions
                     "priority": priority,
                     "due_date": due_date,
                     "source_email_id": str(email_id)
-                }
-                task = EmailTask(**task_data)
-                tasks.append(task)
-                logger.debug(f"Extracted task: {task.model_dump_json()}")
-            except ValidationError as e:
-                logger.warning(f"Skipping task creation due to validation error for email {email_id}: {e}")
+                })
             except Exception as e:
                 logger.error(f"Unexpected error creating task for email {email_id}: {e}")
 
+    tasks: List[EmailTask] = validate_list_dropping_invalid(
+        EMAIL_TASKS_ADAPTER, tasks_data, logger,
+        describe=lambda task_data: f"task for email {task_data['source_email_id']}"
+    )
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for task in tasks:
+            logger.debug(f"Extracted task: {task.model_dump_json()}")
 
     logger.info(f"Extracted {len(tasks)} potential tasks from {len(emails)} emails.")
     return tasks
@@ -195,7 +212,7 @@ def get_prioritized_tasks_from_emails(use_mock_data: bool = True, max_emails_api
         tasks = parse_emails_for_tasks(emails)
         status_message += f"Extracted {len(tasks)} potential tasks."
         logger.info(status_message)
-        tasks_dict = [task.model_dump(mode='json') for task in tasks]
+        tasks_dict = EMAIL_TASKS_ADAPTER.dump_python(tasks, mode='json') # Whole list in one call
         return tasks_dict, status_message
     else:
         # This case should ideally be handled above, but as a safeguard:
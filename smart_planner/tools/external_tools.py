@@ -1,12 +1,22 @@
 # smart_planner/tools/external_tools.py
 """Tools for fetching external context like weather and traffic."""
 
+import atexit
+import bisect
+import functools
 import logging
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import datetime
+import threading
+import time
+from types import MappingProxyType
 from typing import Optional, Dict, Any, Tuple, List
 from cachetools import cached, TTLCache
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
+from cachetools.keys import hashkey
 
 from ..config import settings
 from ..models.schemas import WeatherInfo, TrafficInfo, ContextRecommendation
@@ -14,22 +24,118 @@ from ..models.schemas import WeatherInfo, TrafficInfo, ContextRecommendation
 logger = logging.getLogger(__name__)
 
 # Cache configuration (e.g., cache weather for 15 minutes, traffic for 5 minutes)
-weather_cache = TTLCache(maxsize=100, ttl=15 * 60)
-traffic_cache = TTLCache(maxsize=100, ttl=5 * 60)
+weather_cache = TTLCache(maxsize=1024, ttl=15 * 60)
+traffic_cache = TTLCache(maxsize=1024, ttl=5 * 60)
+# Guard the caches across worker threads; concurrent misses for the same key wait
+# on the condition for the first fetch instead of issuing duplicate API calls
+weather_cache_condition = threading.Condition()
+traffic_cache_condition = threading.Condition()
+
+# Last good responses, kept much longer and served (flagged stale) only when the upstream API fails
+stale_weather_cache = TTLCache(maxsize=1024, ttl=6 * 60 * 60)
+stale_traffic_cache = TTLCache(maxsize=1024, ttl=60 * 60)
+_stale_cache_lock = threading.Lock()
+STALE_STATUS_SUFFIX = " (stale, upstream unavailable)"
+
+# Retry configuration for API calls, applied by urllib3 inside the connection pool
+# (reusing the open socket and honouring Retry-After) rather than re-running the fetchers
+RETRY_ATTEMPTS = 4
+# Exponential backoff with jitter, so callers hit by the same outage do not retry in lockstep
+RETRY_BACKOFF_FACTOR = 0.25
+RETRY_MAX_WAIT_SECONDS = 4.0
+RETRY_JITTER_SECONDS = 0.5
+# HTTP statuses worth retrying; other 4xx/5xx responses fail fast
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+_http_retry = Retry(
+    total=RETRY_ATTEMPTS - 1, # Retries after the first attempt (timeouts, connection errors, statuses)
+    backoff_factor=RETRY_BACKOFF_FACTOR,
+    backoff_max=RETRY_MAX_WAIT_SECONDS,
+    backoff_jitter=RETRY_JITTER_SECONDS,
+    status_forcelist=RETRYABLE_STATUS_CODES,
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+    raise_on_status=False, # Hand back the last response so raise_for_status reports it
+)
+
+# (connect, read) timeouts in seconds: an unreachable host fails fast, slow answers get longer.
+# 3.05s sits just past the 3s TCP SYN retransmit interval
+WEATHER_TIMEOUT = (3.05, 7)
+MAPS_TIMEOUT = (3.05, 10)
+
+# Shared HTTP session: keeps connections alive across calls so repeated lookups
+# skip the TCP/TLS handshake. Pool sized for concurrent weather/traffic fetches.
+HTTP_POOL_SIZE = 16
+http_session = requests.Session()
+# Advertise every content coding urllib3 can decode here (adds br/zstd when brotli/zstandard are installed)
+http_session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+_http_adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=_http_retry)
+http_session.mount("https://", _http_adapter)
+http_session.mount("http://", _http_adapter)
+atexit.register(http_session.close) # Close pooled sockets cleanly on interpreter exit
+
+# Coordinates are rounded to this many decimals (~1 km) for weather cache keys
+WEATHER_KEY_PRECISION = 2
+
+def _weather_cache_key(latitude: float, longitude: float):
+    """Nearby coordinates share one weather cache entry."""
+    return hashkey(round(latitude, WEATHER_KEY_PRECISION), round(longitude, WEATHER_KEY_PRECISION))
+
+def _traffic_cache_key(origin: str, destination: str):
+    """Routes differing only in case or surrounding whitespace share one traffic cache entry."""
+    return hashkey(origin.strip().lower(), destination.strip().lower())
+
+def _remember_stale(cache: TTLCache, key, value: Dict[str, Any]) -> None:
+    """Records a successful response as the fallback for later upstream failures."""
+    with _stale_cache_lock:
+        cache[key] = value
+
+def _get_stale(cache: TTLCache, key) -> Optional[Dict[str, Any]]:
+    """Returns the last successful response for `key`, if still retained."""
+    with _stale_cache_lock:
+        return cache.get(key)
+
+# Shared read-only default for missing nested response objects
+_EMPTY_MAPPING = MappingProxyType({})
+
+# Traffic delay buckets: delays above each bound (minutes) move up one condition
+TRAFFIC_DELAY_BOUNDS = (5, 15, 30)
+TRAFFIC_CONDITIONS: Tuple[Tuple[str, str], ...] = (
+    ('light', "Traffic conditions seem normal."),
+    ('moderate', "Moderate traffic ({delay} min delay)."),
+    ('heavy', "Heavy traffic ({delay} min delay). Leave earlier."),
+    ('severe', "Significant delay ({delay} min). Consider alternative routes or times."),
+)
+
+# Error responses are logged only up to this many bytes of body
+ERROR_BODY_LOG_LIMIT = 512
 
-# Retry configuration for API calls
-RETRY_ATTEMPTS = 3
-RETRY_WAIT_SECONDS = 2
+def _error_body_preview(response: requests.Response) -> str:
+    """
+    Returns the start of an error response body for logging.
+
+    This bounds the log line, not the download: requests are not streamed, so the
+    whole body has already been read into memory before it is sliced here. Only
+    the slice is decoded.
+    """
+    return response.content[:ERROR_BODY_LOG_LIMIT].decode('utf-8', errors='replace') # Both APIs answer in UTF-8 JSON
+
+def _decode_json(response: requests.Response) -> Any:
+    """
+    Decodes a JSON response body with orjson.
+
+    A malformed body raises requests' JSONDecodeError (a RequestException), as
+    `response.json()` would, so the @cached fetchers do not store a result for it
+    and callers fall back to the stale cache like for any other request failure.
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos, response=response) from e
 
 # --- OpenWeatherMap API Tool ---
 
-@cached(weather_cache)
-@retry(
-    stop=stop_after_attempt(RETRY_ATTEMPTS),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=retry_if_exception_type((requests.exceptions.RequestException, requests.exceptions.Timeout)),
-    reraise=True # Reraise the exception after retries are exhausted
-)
+@cached(weather_cache, key=_weather_cache_key, condition=weather_cache_condition)
 def get_weather_data(latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
     """
     Fetches current weather data from OpenWeatherMap API for given coordinates.
@@ -41,7 +147,8 @@ def get_weather_data(latitude: float, longitude: float) -> Optional[Dict[str, An
     Returns:
         Optional[Dict[str, Any]]: Raw weather data dictionary from API, or None on failure.
     """
-    if not settings.OPENWEATHERMAP_API_KEY:
+    api_key = settings.get_settings().OPENWEATHERMAP_API_KEY
+    if not api_key:
         logger.warning("OpenWeatherMap API key not configured. Cannot fetch weather.")
         return None
 
@@ -49,26 +156,27 @@ def get_weather_data(latitude: float, longitude: float) -> Optional[Dict[str, An
     params = {
         "lat": latitude,
         "lon": longitude,
-        "appid": settings.OPENWEATHERMAP_API_KEY,
+        "appid": api_key,
         "units": "metric",  # Get temperature in Celsius
     }
 
     try:
         logger.info(f"Fetching weather data for lat={latitude}, lon={longitude}")
-        response = requests.get(base_url, params=params, timeout=10) # Added timeout
+        response = http_session.get(base_url, params=params, timeout=WEATHER_TIMEOUT)
         response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        weather_data = response.json()
-        logger.debug(f"OpenWeatherMap API response: {weather_data}")
+        weather_data = _decode_json(response)
+        logger.debug("OpenWeatherMap API response: %s", weather_data) # Formatted only if DEBUG is on
+        _remember_stale(stale_weather_cache, _weather_cache_key(latitude, longitude), weather_data)
         return weather_data
     except requests.exceptions.Timeout:
         logger.error(f"Timeout occurred while fetching weather data for {latitude}, {longitude}.")
-        raise # Re-raise for tenacity to handle retries
+        raise # Retries already happened in the connection pool
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching weather data for {latitude}, {longitude}: {e}")
         # Log specific status codes if needed (e.g., 401 for bad API key)
         if e.response is not None:
-             logger.error(f"Response status code: {e.response.status_code}, Response body: {e.response.text}")
-        raise # Re-raise for tenacity to handle retries
+             logger.error(f"Response status code: {e.response.status_code}, Response body: {_error_body_preview(e.response)}")
+        raise # Retries already happened in the connection pool
     except Exception as e:
         logger.error(f"An unexpected error occurred during weather fetch: {e}")
         return None # Return None for non-retryable errors after retries
@@ -80,9 +188,10 @@ def parse_weather_data(weather_data: Dict[str, Any], location_name: Optional[str
         return None
     try:
         description = weather_data['weather'][0].get('description', 'No description').capitalize()
-        temp = weather_data.get('main', {}).get('temp')
+        temp = (weather_data.get('main') or _EMPTY_MAPPING).get('temp')
         timestamp = weather_data.get('dt')
-        weather_time = datetime.datetime.fromtimestamp(timestamp).time() if timestamp else None
+        # Local wall-clock time of the observation, built without an intermediate datetime
+        weather_time = datetime.time(*time.localtime(timestamp)[3:6]) if timestamp else None
 
         return WeatherInfo(
             time=weather_time,
@@ -96,13 +205,7 @@ def parse_weather_data(weather_data: Dict[str, Any], location_name: Optional[str
 
 # --- Google Maps API Tool (Directions/Distance Matrix) ---
 
-@cached(traffic_cache)
-@retry(
-    stop=stop_after_attempt(RETRY_ATTEMPTS),
-    wait=wait_fixed(RETRY_WAIT_SECONDS),
-    retry=retry_if_exception_type((requests.exceptions.RequestException, requests.exceptions.Timeout)),
-    reraise=True
-)
+@cached(traffic_cache, key=_traffic_cache_key, condition=traffic_cache_condition)
 def get_traffic_data(origin: str, destination: str) -> Optional[Dict[str, Any]]:
     """
     Fetches traffic data (estimated duration) using Google Maps Directions API.
@@ -114,7 +217,8 @@ def get_traffic_data(origin: str, destination: str) -> Optional[Dict[str, Any]]:
     Returns:
         Optional[Dict[str, Any]]: Raw directions data dictionary from API, or None on failure.
     """
-    if not settings.GOOGLE_MAPS_API_KEY:
+    api_key = settings.get_settings().GOOGLE_MAPS_API_KEY
+    if not api_key:
         logger.warning("Google Maps API key not configured. Cannot fetch traffic data.")
         return None
 
@@ -122,26 +226,28 @@ def get_traffic_data(origin: str, destination: str) -> Optional[Dict[str, Any]]:
     params = {
         "origin": origin,
         "destination": destination,
-        "key": settings.GOOGLE_MAPS_API_KEY,
+        "key": api_key,
         "departure_time": "now",  # Get traffic estimate based on current conditions
         "traffic_model": "best_guess", # Factors in current and historical traffic
     }
 
     try:
         logger.info(f"Fetching traffic data from '{origin}' to '{destination}'")
-        response = requests.get(base_url, params=params, timeout=15) # Increased timeout for Directions API
+        response = http_session.get(base_url, params=params, timeout=MAPS_TIMEOUT) # Longer read timeout for Directions API
         response.raise_for_status()
-        directions_data = response.json()
-        logger.debug(f"Google Directions API response: {directions_data}")
+        directions_data = _decode_json(response)
+        logger.debug("Google Directions API response: %s", directions_data) # Formatted only if DEBUG is on
 
         if directions_data.get("status") != "OK":
-            logger.error(f"Google Directions API returned status: {directions_data.get('status')}. "
-                         f"Error message: {directions_data.get('error_message')}")
-            # Consider specific statuses like ZERO_RESULTS as non-errors but empty results
+            # ZERO_RESULTS is a non-error empty result; the sentinel is cached like any answer
             if directions_data.get("status") == "ZERO_RESULTS":
+                logger.info(f"Google Directions API found no route from '{origin}' to '{destination}'.")
                 return {"status": "ZERO_RESULTS", "routes": []} # Return structure indicating no route
+            logger.error(f"Google Directions API returned status: {directions_data.get('status')}. "
+                         f"Error message: {directions_data.get('error_message')}")
             return None # Treat other non-OK statuses as errors
 
+        _remember_stale(stale_traffic_cache, _traffic_cache_key(origin, destination), directions_data)
         return directions_data
     except requests.exceptions.Timeout:
         logger.error(f"Timeout occurred while fetching traffic data for {origin} -> {destination}.")
@@ -149,7 +255,7 @@ def get_traffic_data(origin: str, destination: str) -> Optional[Dict[str, Any]]:
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching traffic data for {origin} -> {destination}: {e}")
         if e.response is not None:
-             logger.error(f"Response status code: {e.response.status_code}, Response body: {e.response.text}")
+             logger.error(f"Response status code: {e.response.status_code}, Response body: {_error_body_preview(e.response)}")
         raise
     except Exception as e:
         logger.error(f"An unexpected error occurred during traffic fetch: {e}")
@@ -166,8 +272,8 @@ def parse_traffic_data(directions_data: Dict[str, Any], origin: str, destination
         route = directions_data["routes"][0]
         leg = route["legs"][0] # Assuming single leg for simplicity
 
-        duration_sec = leg.get("duration", {}).get("value")
-        duration_in_traffic_sec = leg.get("duration_in_traffic", {}).get("value")
+        duration_sec = (leg.get("duration") or _EMPTY_MAPPING).get("value")
+        duration_in_traffic_sec = (leg.get("duration_in_traffic") or _EMPTY_MAPPING).get("value")
 
         delay_minutes = None
         condition = 'light' # Default
@@ -177,19 +283,9 @@ def parse_traffic_data(directions_data: Dict[str, Any], origin: str, destination
             delay_seconds = duration_in_traffic_sec - duration_sec
             delay_minutes = max(0, round(delay_seconds / 60)) # Ensure non-negative delay
 
-            # Simple condition logic based on delay percentage or absolute value
-            if delay_minutes > 30:
-                condition = 'severe'
-                recommendation = f"Significant delay ({delay_minutes} min). Consider alternative routes or times."
-            elif delay_minutes > 15:
-                condition = 'heavy'
-                recommendation = f"Heavy traffic ({delay_minutes} min delay). Leave earlier."
-            elif delay_minutes > 5:
-                condition = 'moderate'
-                recommendation = f"Moderate traffic ({delay_minutes} min delay)."
-            else:
-                condition = 'light'
-                recommendation = "Traffic conditions seem normal."
+            # Simple condition logic based on the absolute delay
+            condition, template = TRAFFIC_CONDITIONS[bisect.bisect_left(TRAFFIC_DELAY_BOUNDS, delay_minutes)]
+            recommendation = template.format(delay=delay_minutes)
         else:
              logger.warning(f"Could not determine traffic delay for {origin} -> {destination}. Duration data missing.")
              recommendation = "Could not determine traffic delay."
@@ -205,8 +301,148 @@ def parse_traffic_data(directions_data: Dict[str, Any], origin: str, destination
         logger.error(f"Error parsing traffic data: {e}. Data: {directions_data}")
         return None
 
+# --- Google Maps Distance Matrix (batched traffic) ---
+
+# Distance Matrix limit: 25 origins or destinations per request. Batches here are
+# always one origin x many destinations (or the reverse), so the 100-element cap never binds
+MATRIX_MAX_PLACES = 25
+
+def get_traffic_matrix(origins: List[str], destinations: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Fetches traffic durations for every origin/destination pair in one Distance Matrix call.
+
+    Args:
+        origins (List[str]): Starting addresses or "lat,lon" strings.
+        destinations (List[str]): Ending addresses or "lat,lon" strings.
+
+    Returns:
+        Optional[Dict[str, Any]]: Raw Distance Matrix response, or None on failure.
+    """
+    api_key = settings.get_settings().GOOGLE_MAPS_API_KEY
+    if not api_key:
+        logger.warning("Google Maps API key not configured. Cannot fetch traffic data.")
+        return None
+
+    base_url = "https://maps.googleapis.com/maps/api/distancematrix/json"
+    params = {
+        "origins": "|".join(origins),
+        "destinations": "|".join(destinations),
+        "key": api_key,
+        "departure_time": "now",
+        "traffic_model": "best_guess",
+    }
+
+    try:
+        logger.info(f"Fetching traffic matrix for {len(origins)} origins x {len(destinations)} destinations")
+        response = http_session.get(base_url, params=params, timeout=MAPS_TIMEOUT)
+        response.raise_for_status()
+        matrix_data = _decode_json(response)
+        if matrix_data.get("status") != "OK":
+            logger.error(f"Google Distance Matrix API returned status: {matrix_data.get('status')}. "
+                         f"Error message: {matrix_data.get('error_message')}")
+            return None
+        return matrix_data
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error fetching traffic matrix: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during traffic matrix fetch: {e}")
+        return None
+
+def group_routes_for_matrix(routes: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    """
+    Groups routes into Distance Matrix batches that bill only for useful elements.
+
+    A matrix request is charged for every origin x destination element, so only
+    routes sharing an origin (one row) or a destination (one column) are batched.
+    Chained commute legs (home->A, A->B, B->C) share neither and are left out,
+    to be fetched per route with Directions calls.
+
+    Args:
+        routes (List[Tuple[str, str]]): (origin, destination) pairs.
+
+    Returns:
+        List[List[Tuple[str, str]]]: Groups of at least two routes, each with a
+        single origin or a single destination.
+    """
+    groups: List[List[Tuple[str, str]]] = []
+    remaining = list(dict.fromkeys(routes))
+    for shared_index in (0, 1): # Shared origins first, then shared destinations
+        by_endpoint: Dict[str, List[Tuple[str, str]]] = {}
+        for route in remaining:
+            by_endpoint.setdefault(route[shared_index], []).append(route)
+        grouped = set()
+        for endpoint_routes in by_endpoint.values():
+            if len(endpoint_routes) < 2:
+                continue
+            for i in range(0, len(endpoint_routes), MATRIX_MAX_PLACES):
+                chunk = endpoint_routes[i:i + MATRIX_MAX_PLACES]
+                if len(chunk) > 1:
+                    groups.append(chunk)
+                    grouped.update(chunk)
+        remaining = [route for route in remaining if route not in grouped]
+    return groups
+
+def prefetch_traffic_data(routes: List[Tuple[str, str]]) -> int:
+    """
+    Warms the traffic cache for several routes with batched Distance Matrix requests.
+
+    Routes already cached are skipped, and only groups from group_routes_for_matrix
+    are requested. Each matrix element is stored in the shape get_traffic_data
+    returns, so later get_traffic_info calls for these routes are cache hits.
+    Routes the matrix could not answer are left for a per-route fetch.
+
+    Args:
+        routes (List[Tuple[str, str]]): (origin, destination) pairs.
+
+    Returns:
+        int: Number of routes added to the cache.
+    """
+    with traffic_cache_condition:
+        missing = [route for route in dict.fromkeys(routes) if _traffic_cache_key(*route) not in traffic_cache]
+    if len(missing) < 2:
+        return 0 # A single route is no cheaper batched
+
+    cached_count = 0
+    for chunk in group_routes_for_matrix(missing):
+        origins = list(dict.fromkeys(origin for origin, _ in chunk))
+        destinations = list(dict.fromkeys(destination for _, destination in chunk))
+        try:
+            matrix_data = get_traffic_matrix(origins, destinations)
+        except requests.exceptions.RequestException:
+            continue # Already logged; the per-route path will fetch these
+        if not matrix_data:
+            continue
+        rows = matrix_data.get("rows", [])
+        for origin, destination in chunk:
+            try:
+                element = rows[origins.index(origin)]["elements"][destinations.index(destination)]
+            except (IndexError, KeyError, TypeError):
+                continue
+            if element.get("status") == "OK":
+                # Same shape as a one-route Directions response, so parse_traffic_data applies
+                directions_data = {"status": "OK", "routes": [{"legs": [element]}]}
+            elif element.get("status") == "ZERO_RESULTS":
+                directions_data = {"status": "ZERO_RESULTS", "routes": []}
+            else:
+                continue
+            key = _traffic_cache_key(origin, destination)
+            with traffic_cache_condition:
+                traffic_cache[key] = directions_data
+            _remember_stale(stale_traffic_cache, key, directions_data)
+            cached_count += 1
+
+    logger.info(f"Prefetched traffic for {cached_count} of {len(missing)} routes via Distance Matrix.")
+    return cached_count
+
 # --- ADK Tool Definitions ---
 
+@functools.lru_cache(maxsize=4096)
+def _parse_latlon(location_query: str) -> Tuple[float, float]:
+    """Parses a "latitude,longitude" query once per distinct string; raises ValueError if malformed."""
+    lat_str, lon_str = location_query.split(',')
+    return float(lat_str.strip()), float(lon_str.strip())
+
 def get_current_weather(location_query: str) -> Tuple[Optional[dict], str]:
     """
     Gets current weather for a location (uses geocoding first if not lat/lon).
@@ -220,21 +456,27 @@ def get_current_weather(location_query: str) -> Tuple[Optional[dict], str]:
         Tuple[Optional[dict], str]: WeatherInfo dictionary and status message.
     """
     try:
-        lat_str, lon_str = location_query.split(',')
-        latitude = float(lat_str.strip())
-        longitude = float(lon_str.strip())
-    except (ValueError, AttributeError):
+        latitude, longitude = _parse_latlon(location_query)
+    except (ValueError, AttributeError, TypeError):
         logger.error(f"Invalid location_query format: '{location_query}'. Expected 'latitude,longitude'. Geocoding not implemented.")
         # TODO: Implement geocoding lookup here using Google Geocoding API or similar
         return None, "Invalid location format. Please provide 'latitude,longitude'. Geocoding not implemented."
 
     status_message = ""
     try:
-        raw_weather = get_weather_data(latitude, longitude)
+        stale_suffix = ""
+        try:
+            raw_weather = get_weather_data(latitude, longitude)
+        except requests.exceptions.RequestException:
+            # Retries are exhausted; fall back to the last good response if there is one
+            raw_weather = _get_stale(stale_weather_cache, _weather_cache_key(latitude, longitude))
+            if raw_weather is None:
+                raise
+            stale_suffix = STALE_STATUS_SUFFIX
         if raw_weather:
             weather_info = parse_weather_data(raw_weather, location_name=f"Lat:{latitude}, Lon:{longitude}")
             if weather_info:
-                status_message = f"Successfully fetched weather for {location_query}."
+                status_message = f"Successfully fetched weather for {location_query}{stale_suffix}."
                 logger.info(status_message)
                 return weather_info.model_dump(mode='json'), status_message
             else:
@@ -265,18 +507,31 @@ def get_traffic_info(origin: str, destination: str) -> Tuple[Optional[dict], str
     """
     status_message = ""
     try:
-        raw_traffic = get_traffic_data(origin, destination)
+        stale_suffix = ""
+        try:
+            raw_traffic = get_traffic_data(origin, destination)
+        except requests.exceptions.RequestException:
+            # Retries are exhausted; fall back to the last good response if there is one
+            raw_traffic = _get_stale(stale_traffic_cache, _traffic_cache_key(origin, destination))
+            if raw_traffic is None:
+                raise
+            stale_suffix = STALE_STATUS_SUFFIX
         if raw_traffic:
-            # Handle ZERO_RESULTS explicitly
+            # Handle ZERO_RESULTS explicitly: a valid answer (no route), not a failure
             if raw_traffic.get("status") == "ZERO_RESULTS":
                  status_message = f"No route found between '{origin}' and '{destination}'."
                  logger.info(status_message)
-                 # Return an empty TrafficInfo or specific indicator? For now, None.
-                 return None, status_message
+                 traffic_info = TrafficInfo(
+                     route_description=f"{origin} to {destination}",
+                     delay_minutes=None,
+                     condition='unreachable',
+                     recommendation="No route available."
+                 )
+                 return traffic_info.model_dump(mode='json'), status_message
 
             traffic_info = parse_traffic_data(raw_traffic, origin, destination)
             if traffic_info:
-                status_message = f"Successfully fetched traffic info for {origin} -> {destination}."
+                status_message = f"Successfully fetched traffic info for {origin} -> {destination}{stale_suffix}."
                 logger.info(status_message)
                 return traffic_info.model_dump(mode='json'), status_message
             else:
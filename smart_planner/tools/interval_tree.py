@@ -0,0 +1,142 @@
+# smart_planner/tools/interval_tree.py
+"""Augmented interval tree used for incremental schedule analysis."""
+
+import itertools
+import random
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Set
+
+
+class _Node:
+    """A single interval in the tree, augmented with its subtree's latest end."""
+    __slots__ = ("start", "end", "key", "value", "order", "priority", "max_end", "left", "right")
+
+    def __init__(self, start: Any, end: Any, key: Hashable, value: Any, order: int):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.value = value
+        self.order = order # Tie-breaker so equal start times keep insertion order
+        self.priority = random.random()
+        self.max_end = end
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+    def update(self) -> None:
+        """Recomputes max_end from this node and its children."""
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+class IntervalTree:
+    """
+    Interval tree keyed by start time (a treap, so it stays balanced in expectation).
+
+    Every node stores the maximum end time of its subtree, which lets overlap
+    queries skip whole branches: insert is O(log n) and an overlap query is
+    O(log n + k) for k matches. Values are kept in start-time order, so
+    iterating the tree yields them chronologically.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._nodes: Dict[Hashable, _Node] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._nodes
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yields stored values in ascending start-time order."""
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    def keys(self) -> Set[Hashable]:
+        """Returns the set of keys currently stored in the tree."""
+        return set(self._nodes)
+
+    def insert(self, start: Any, end: Any, key: Hashable, value: Any) -> None:
+        """
+        Inserts an interval. For a key already present only the stored value is
+        replaced; the interval (and so the tree's shape) is left as it was.
+
+        Args:
+            start: Interval start (any comparable value, e.g. datetime).
+            end: Interval end.
+            key: Hashable identity used to detect already-inserted intervals.
+            value: Payload returned by iteration and queries.
+        """
+        existing = self._nodes.get(key)
+        if existing is not None:
+            existing.value = value
+            return
+        node = _Node(start, end, key, value, next(self._counter))
+        self._nodes[key] = node
+        self._root = self._insert(self._root, node)
+
+    def _insert(self, root: Optional[_Node], node: _Node) -> _Node:
+        if root is None:
+            return node
+        if (node.start, node.order) < (root.start, root.order):
+            root.left = self._insert(root.left, node)
+            if root.left.priority > root.priority:
+                root = self._rotate_right(root)
+        else:
+            root.right = self._insert(root.right, node)
+            if root.right.priority > root.priority:
+                root = self._rotate_left(root)
+        root.update()
+        return root
+
+    @staticmethod
+    def _rotate_right(node: _Node) -> _Node:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.update()
+        pivot.update()
+        return pivot
+
+    @staticmethod
+    def _rotate_left(node: _Node) -> _Node:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.update()
+        pivot.update()
+        return pivot
+
+    def overlapping(self, start: Any, end: Any) -> List[Any]:
+        """
+        Returns values whose interval strictly overlaps [start, end), in start order.
+
+        Zero-length and inverted intervals never overlap anything, matching the
+        `max(start1, start2) < min(end1, end2)` rule used for conflicts.
+        """
+        results: List[Any] = []
+        if not start < end:
+            return results
+        self._overlapping(self._root, start, end, results)
+        return results
+
+    def _overlapping(self, node: Optional[_Node], start: Any, end: Any, results: List[Any]) -> None:
+        if node is None or node.max_end <= start:
+            return # Nothing in this subtree ends after the query starts
+        self._overlapping(node.left, start, end, results)
+        if node.start < end:
+            if start < node.end and node.start < node.end:
+                results.append(node.value)
+            self._overlapping(node.right, start, end, results)
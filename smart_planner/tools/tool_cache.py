@@ -0,0 +1,84 @@
+# smart_planner/tools/tool_cache.py
+"""TTL memoization for agent tool methods."""
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Hashable, Tuple
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def _is_cacheable(result: Any) -> bool:
+    """Tool errors are returned as {"error": ...} or {"status": "error"} and must not be cached."""
+    return not (isinstance(result, dict) and ("error" in result or result.get("status") == "error"))
+
+
+def cached_tool(cache: TTLCache) -> Callable:
+    """
+    Decorator caching an agent tool method's result in the given TTLCache.
+
+    The key is the tool name plus its normalized arguments (defaults applied,
+    positional and keyword calls treated alike); the agent instance itself is
+    not part of the key, so all agents share hits. Works for both regular and
+    `async def` tools; for the latter the awaited result is cached, not the
+    coroutine. Cached results are shared between callers and must not be mutated.
+
+    Args:
+        cache (TTLCache): Cache holding the results; its ttl sets the lifetime.
+
+    Returns:
+        Callable: The decorator.
+    """
+    lock = threading.Lock()
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        tool_name = func.__qualname__
+
+        def make_key(args: Tuple[Any, ...], kwargs: dict) -> Hashable:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())[1:] # Skip `self`
+            return (tool_name, *arguments)
+
+        def lookup(key: Hashable) -> Tuple[bool, Any]:
+            with lock:
+                if key in cache:
+                    logger.debug(f"Tool cache hit for {key}")
+                    return True, cache[key]
+            return False, None
+
+        def store(key: Hashable, result: Any) -> None:
+            if _is_cacheable(result):
+                with lock:
+                    cache[key] = result
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                hit, result = lookup(key)
+                if hit:
+                    return result
+                result = await func(*args, **kwargs)
+                store(key, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            hit, result = lookup(key)
+            if hit:
+                return result
+            result = func(*args, **kwargs)
+            store(key, result)
+            return result
+        return wrapper
+
+    return decorator